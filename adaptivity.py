@@ -0,0 +1,269 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+import assembly
+import boundary
+import solvers
+from geometry import Geometry
+from triplets import Triplets
+
+
+def longest_edge_first(mesh) -> None:
+    """
+    Fait tourner les sommets de chaque triangle pour que l'arête (v1, v2), celle que la bisection coupe, soit sa plus
+    grande arête. L'orientation des triangles est conservée. C'est l'étiquetage initial conseillé pour la bisection
+    par le plus récent sommet (voir refine).
+    :param mesh: le maillage, modifié sur place
+    :return: None
+    """
+    p = mesh.coords[mesh.triangle_nodes]
+    # longueur de l'arête opposée à chaque sommet
+    lengths = np.stack([np.sum((p[:, (k + 2) % 3] - p[:, (k + 1) % 3]) ** 2, axis=1) for k in range(3)], axis=1)
+    shift = np.argmax(lengths, axis=1)
+    columns = (shift[:, None] + np.arange(3)) % 3
+    mesh.triangle_nodes = np.take_along_axis(mesh.triangle_nodes, columns, axis=1)
+
+
+def gradient_recovery_estimator(mesh, U: np.ndarray) -> np.ndarray:
+    """
+    Estimateur d'erreur par reconstruction du gradient (Zienkiewicz-Zhu) : le gradient de la solution, constant par
+    triangle, est moyenné aux sommets (moyenne pondérée par les aires) puis on mesure sur chaque triangle l'écart
+    entre ce gradient reconstruit, interpolé P1, et le gradient du triangle
+    :param mesh: le maillage considéré
+    :param U: la solution aux points
+    :return: tableau (Ntri,) des indicateurs eta_T, l'erreur globale estimée est sqrt(somme des eta_T^2)
+    """
+    geometry = mesh.geometry
+    nodes = mesh.triangle_nodes
+    gradients = np.einsum("ti,tia->ta", U[nodes], geometry.gradients) # gradient de u_h sur chaque triangle
+    weights = np.bincount(nodes.ravel(), weights=np.repeat(geometry.area, 3), minlength=mesh.Npts)
+    recovered = np.stack([np.bincount(nodes.ravel(), weights=np.repeat(geometry.area * gradients[:, a], 3),
+                                      minlength=mesh.Npts) for a in range(2)], axis=1) / weights[:, None]
+    e = recovered[nodes] - gradients[:, None, :] # écart aux trois sommets (Ntri, 3, 2)
+    # intégrale exacte du carré d'une fonction P1 : aire / 12 * (somme des carrés + carré de la somme)
+    squared = geometry.area / 12 * (np.sum(e ** 2, axis=(1, 2)) + np.sum(e.sum(axis=1) ** 2, axis=1))
+    return np.sqrt(squared)
+
+
+def dorfler_marking(eta: np.ndarray, theta: float = 0.5) -> np.ndarray:
+    """
+    Marquage de Dörfler : le plus petit ensemble de triangles qui porte une fraction theta de l'erreur estimée
+    :param eta: les indicateurs d'erreur par triangle
+    :param theta: la fraction de l'erreur (au carré) à couvrir, entre 0 et 1
+    :return: tableau booléen (Ntri,) des triangles à raffiner
+    """
+    squared = eta ** 2
+    order = np.argsort(squared)[::-1]
+    cumulated = np.cumsum(squared[order])
+    count = int(np.searchsorted(cumulated, theta * cumulated[-1])) + 1
+    marked = np.zeros(len(eta), dtype=bool)
+    marked[order[:count]] = True
+    return marked
+
+
+def refine(mesh, marked: np.ndarray) -> tuple[np.ndarray, int]:
+    """
+    Raffinement local par bisection du plus récent sommet. Un triangle (v0, v1, v2) est coupé au milieu m de son
+    arête (v1, v2) en (m, v0, v1) et (m, v2, v0), le nouveau sommet m devient le v0 des deux enfants. On coupe les
+    arêtes de raffinement des triangles marqués puis, tant qu'un triangle a une arête coupée qui n'est pas son arête
+    de raffinement, on coupe aussi celle-ci : le maillage obtenu est conforme et chaque triangle touché donne 2, 3
+    ou 4 enfants. Les nouveaux points sont ajoutés après les anciens, qui gardent leur numéro.
+    :param mesh: le maillage, modifié sur place
+    :param marked: tableau booléen (Ntri,) des triangles à raffiner
+    :return: (refined, first_child) : les indices (dans l'ancien maillage) des triangles qui ont été coupés, et
+    l'indice à partir duquel les triangles du nouveau maillage sont leurs enfants (les triangles non coupés gardent
+    leur ordre au début)
+    """
+    n = mesh.Npts
+    nodes = mesh.triangle_nodes
+    v0, v1, v2 = nodes[:, 0], nodes[:, 1], nodes[:, 2]
+    # arêtes de chaque triangle : 0 = (v1, v2) l'arête de raffinement, 1 = (v2, v0), 2 = (v0, v1)
+    edges, triangle_edges = mesh.topology.edges, mesh.topology.triangle_edges
+    cut = np.zeros(len(edges), dtype=bool)
+    cut[triangle_edges[marked, 0]] = True
+    while True: # fermeture de conformité
+        needed = cut[triangle_edges].any(axis=1) & ~cut[triangle_edges[:, 0]]
+        if not needed.any():
+            break
+        cut[triangle_edges[needed, 0]] = True
+
+    # un nouveau point au milieu de chaque arête coupée
+    midpoint = np.full(len(edges), -1, dtype=np.int64)
+    midpoint[cut] = n + np.arange(cut.sum())
+    coords = np.concatenate((mesh.coords, mesh.coords[edges[cut]].mean(axis=1)))
+
+    refined = np.flatnonzero(cut[triangle_edges[:, 0]])
+    m = midpoint[triangle_edges[refined, 0]]
+    t0, t1, t2 = v0[refined], v1[refined], v2[refined]
+    m1 = midpoint[triangle_edges[refined, 1]] # milieu de (v2, v0) s'il existe
+    m2 = midpoint[triangle_edges[refined, 2]] # milieu de (v0, v1) s'il existe
+    tags = mesh.triangle_tags[refined]
+    children, children_tags = [], []
+    # premier enfant (m, v0, v1), recoupé en (m2, m, v0) et (m2, v1, m) si son arête (v0, v1) est coupée
+    whole = m2 < 0
+    children += [np.column_stack((m, t0, t1))[whole],
+                 np.column_stack((m2, m, t0))[~whole], np.column_stack((m2, t1, m))[~whole]]
+    children_tags += [tags[whole], tags[~whole], tags[~whole]]
+    # second enfant (m, v2, v0), recoupé en (m1, m, v2) et (m1, v0, m) si son arête (v2, v0) est coupée
+    whole = m1 < 0
+    children += [np.column_stack((m, t2, t0))[whole],
+                 np.column_stack((m1, m, t2))[~whole], np.column_stack((m1, t0, m))[~whole]]
+    children_tags += [tags[whole], tags[~whole], tags[~whole]]
+
+    kept = np.ones(mesh.Ntri, dtype=bool)
+    kept[refined] = False
+    triangle_nodes = np.concatenate([nodes[kept]] + children)
+    triangle_tags = np.concatenate([mesh.triangle_tags[kept]] + children_tags)
+
+    # les segments du bord dont l'arête est coupée sont coupés en deux
+    segment_edges = mesh.topology.segment_edges
+    split = (segment_edges >= 0) & cut[segment_edges]
+    s0, s1 = mesh.segment_nodes[split, 0], mesh.segment_nodes[split, 1]
+    sm = midpoint[segment_edges[split]]
+    segment_nodes = np.concatenate((mesh.segment_nodes[~split], np.column_stack((s0, sm)), np.column_stack((sm, s1))))
+    segment_tags = np.concatenate((mesh.segment_tags[~split], mesh.segment_tags[split], mesh.segment_tags[split]))
+
+    physical_names = mesh.physical_names
+    mesh.set_arrays(coords, triangle_nodes, segment_nodes, triangle_tags, segment_tags)
+    mesh.physical_names = physical_names
+    return refined, int(kept.sum())
+
+
+class AdaptiveLoop:
+    def __init__(self, mesh, source, dirichlet_tag: int = 0, g=0.0, theta: float = 0.5, order: int = 2):
+        """
+        Boucle adaptative résolution -> estimation -> marquage -> raffinement pour -Δu = f avec u = g au bord.
+        La matrice de rigidité et le second membre ne sont pas réassemblés en entier après un raffinement : on retire
+        les contributions des triangles coupés et on ajoute celles de leurs enfants, seuls les triangles modifiés sont
+        donc recalculés.
+        :param mesh: le maillage de départ, raffiné sur place
+        :param source: la fonction source f(x, y), qui doit accepter des tableaux numpy
+        :param dirichlet_tag: le tag physique des segments où la solution est imposée
+        :param g: la valeur imposée, constante ou fonction g(x, y) (elle est réévaluée sur les nouveaux points)
+        :param theta: la fraction de l'erreur couverte par le marquage de Dörfler
+        :param order: le degré de la règle de quadrature du second membre
+        """
+        self.mesh = mesh
+        self.source = source
+        self.dirichlet_tag : int = dirichlet_tag
+        self.g = g
+        self.theta : float = theta
+        self.order : int = order
+        self.history : list[dict] = [] # nombre de points et erreur estimée à chaque itération
+        longest_edge_first(mesh)
+        self.K : csr_matrix = assembly.assemble(mesh).tocsr() # matrice de rigidité sans conditions aux limites
+        self.b : np.ndarray = assembly.assemble_load_vector(mesh, source, order)
+        self.U : np.ndarray = None
+
+    def _element_data(self, coords: np.ndarray, connectivity: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        geometry = Geometry(coords, connectivity)
+        return (assembly.elementary_stiffness_matrices(geometry),
+                assembly.element_load_vectors(geometry, self.source, self.order))
+
+    def solve(self) -> np.ndarray:
+        """
+        Résout le problème sur le maillage actuel
+        :return: la solution aux points
+        """
+        nodes = boundary.dirichlet_nodes(self.mesh, self.dirichlet_tag)
+        values = boundary.dirichlet_values(self.mesh, nodes, self.g)
+        A, b = boundary.apply_dirichlet(self.K, self.b, nodes, values)
+        self.U = solvers.Solver(A, method="direct").solve(b)
+        return self.U
+
+    def refine(self, marked: np.ndarray) -> None:
+        """
+        Raffine le maillage et met à jour la matrice et le second membre de façon incrémentale. Seules les lignes des
+        points des triangles coupés et celles des nouveaux points changent : elles sont recalculées à partir des
+        triangles qui les touchent, puis insérées dans la structure CSR existante, dont les autres lignes sont reprises
+        telles quelles.
+        :param marked: tableau booléen des triangles à raffiner
+        :return: None
+        """
+        old_coords, old_nodes, old_n = self.mesh.coords, self.mesh.triangle_nodes, self.mesh.Npts
+        old_topology = self.mesh.topology
+        refined, first_child = refine(self.mesh, marked)
+        n = self.mesh.Npts
+        removed_K, removed_b = self._element_data(old_coords, old_nodes[refined])
+        children = self.mesh.triangle_nodes[first_child:]
+        added_K, added_b = self._element_data(self.mesh.coords, children)
+
+        # lignes modifiées : les sommets des triangles coupés et les nouveaux points
+        touched = np.zeros(n, dtype=bool)
+        touched[old_nodes[refined]] = True
+        touched[old_n:] = True
+        rows = np.flatnonzero(touched)
+        old_rows = rows[rows < old_n]
+        # structure des lignes modifiées : les points des triangles qui les touchent, c'est-à-dire les enfants et les
+        # triangles non coupés autour des anciens points (lus dans l'ancienne topologie)
+        starts = old_topology.node_triangles_indptr[old_rows]
+        counts = old_topology.node_triangles_indptr[old_rows + 1] - starts
+        around = old_topology.node_triangles[np.repeat(starts - np.cumsum(counts) + counts, counts)
+                                             + np.arange(counts.sum())]
+        cut = np.zeros(len(old_nodes), dtype=bool)
+        cut[refined] = True
+        triangles = np.concatenate((old_nodes[around[~cut[around]]], children)).astype(np.int64)
+        pattern_rows = np.repeat(triangles, 3, axis=1).ravel()
+        pattern_cols = np.tile(triangles, (1, 3)).ravel()
+        keys = np.sort((pattern_rows * n + pattern_cols)[touched[pattern_rows]])
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+
+        # valeurs des lignes modifiées : les anciens coefficients de ces lignes plus la correction des triangles
+        # coupés et de leurs enfants. Les couplages des arêtes coupées, qui ne valent plus qu'un résidu d'arrondi,
+        # ne sont pas dans la nouvelle structure et disparaissent.
+        old_counts = np.diff(self.K.indptr)
+        old_touched = np.repeat(touched[:old_n], old_counts)
+        delta = Triplets(capacity=9 * (len(refined) + len(children)), shape=(n, n))
+        delta.extend_blocks(old_nodes[refined], -removed_K)
+        delta.extend_blocks(children, added_K)
+        vals, (delta_rows, delta_cols) = delta.getData()
+        entries = np.concatenate((np.repeat(np.arange(old_n, dtype=np.int64), old_counts)[old_touched] * n
+                                  + self.K.indices[old_touched], delta_rows.astype(np.int64) * n + delta_cols))
+        position = np.minimum(np.searchsorted(keys, entries), len(keys) - 1)
+        kept = keys[position] == entries
+        values = np.bincount(position[kept], weights=np.concatenate((self.K.data[old_touched], vals))[kept],
+                             minlength=len(keys))
+
+        # nouvelle structure : les lignes non modifiées gardent leurs colonnes et leurs valeurs
+        new_counts = np.zeros(n, dtype=np.int64)
+        new_counts[:old_n] = old_counts
+        new_counts[touched] = 0
+        new_counts += np.bincount(keys // n, minlength=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(new_counts, out=indptr[1:])
+        indices = np.empty(indptr[-1], dtype=self.K.indices.dtype)
+        data = np.empty(indptr[-1])
+        shift = np.repeat(indptr[:old_n] - self.K.indptr[:-1], old_counts)
+        destination = np.flatnonzero(~old_touched)
+        destination += shift[destination]
+        indices[destination] = self.K.indices[~old_touched]
+        data[destination] = self.K.data[~old_touched]
+        key_rows = keys // n
+        destination = indptr[key_rows] + np.arange(len(keys)) - np.searchsorted(key_rows, key_rows)
+        indices[destination] = keys % n
+        data[destination] = values
+        self.K = csr_matrix((data, indices, indptr), shape=(n, n))
+
+        b = np.concatenate((self.b, np.zeros(n - old_n)))
+        b -= np.bincount(old_nodes[refined].ravel(), weights=removed_b.ravel(), minlength=n)
+        b += np.bincount(children.ravel(), weights=added_b.ravel(), minlength=n)
+        self.b = b
+
+    def run(self, tolerance: float, max_iterations: int = 20, max_nodes: int = None) -> np.ndarray:
+        """
+        Raffine jusqu'à ce que l'erreur estimée passe sous tolerance
+        :param tolerance: l'erreur estimée visée (en norme H1 semi-norme)
+        :param max_iterations: nombre maximal de raffinements
+        :param max_nodes: nombre maximal de points du maillage
+        :return: la solution sur le dernier maillage
+        """
+        for _ in range(max_iterations + 1):
+            self.solve()
+            eta = gradient_recovery_estimator(self.mesh, self.U)
+            estimate = float(np.sqrt(np.sum(eta ** 2)))
+            self.history.append({"Npts": self.mesh.Npts, "Ntri": self.mesh.Ntri, "estimate": estimate})
+            if estimate <= tolerance or len(self.history) > max_iterations or \
+                    (max_nodes is not None and self.mesh.Npts >= max_nodes):
+                break
+            self.refine(dorfler_marking(eta, self.theta))
+        return self.U
@@ -0,0 +1,127 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+import fem_utils
+from geometry import Geometry
+from triplets import Triplets
+
+# Matrice de masse élémentaire du triangle de référence, à multiplier par l'aire du triangle
+REF_MASS = np.array([[2.0, 1.0, 1.0], [1.0, 2.0, 1.0], [1.0, 1.0, 2.0]]) / 12
+
+
+def elementary_stiffness_matrices(geometry: Geometry) -> np.ndarray:
+    """
+    Calcul de toutes les matrices de rigidité élémentaires en une seule fois.
+    Pour chaque triangle on a Bp = J^(-T) et K_ij = aire * (Bp grad_phi(i)) . (Bp grad_phi(j)), ce qui correspond
+    exactement au calcul fait triangle par triangle dans main.py
+    :param geometry: la géométrie des triangles (Mesh.geometry)
+    :return: tableau (Ntri, 3, 3)
+    """
+    return geometry.stiffness()
+
+
+def elementary_mass_matrices(geometry: Geometry) -> np.ndarray:
+    """
+    Calcul de toutes les matrices de masse élémentaires en une seule fois
+    :param geometry: la géométrie des triangles (Mesh.geometry)
+    :return: tableau (Ntri, 3, 3)
+    """
+    return geometry.area[:, None, None] * REF_MASS
+
+
+def element_matrices(mesh, stiffness: float = 1.0, mass: float = 0.0) -> np.ndarray:
+    """
+    Calcule les matrices élémentaires de stiffness * K + mass * M pour tous les triangles
+    :param mesh: le maillage considéré
+    :param stiffness: coefficient devant la matrice de rigidité
+    :param mass: coefficient devant la matrice de masse
+    :return: tableau (Ntri, 3, 3), dans l'ordre des triplets produits par assemble
+    """
+    elementary = np.zeros((mesh.Ntri, 3, 3))
+    if stiffness != 0:
+        elementary += stiffness * elementary_stiffness_matrices(mesh.geometry)
+    if mass != 0:
+        elementary += mass * elementary_mass_matrices(mesh.geometry)
+    return elementary
+
+
+def assemble(mesh, stiffness: float = 1.0, mass: float = 0.0, triplets: Triplets = None) -> Triplets:
+    """
+    Assemble la matrice stiffness * K + mass * M du maillage sous forme de triplets, sans boucle Python sur les
+    triangles. Pour réassembler avec d'autres coefficients sur le même maillage, il suffit de garder
+    triplets.symbolic() et de lui passer element_matrices(...).ravel().
+    :param mesh: le maillage considéré
+    :param stiffness: coefficient devant la matrice de rigidité
+    :param mass: coefficient devant la matrice de masse
+    :param triplets: triplets à compléter, s'il n'est pas donné on en crée un nouveau, préalloué à 9 * Ntri
+    :return: les triplets complétés
+    """
+    if triplets is None:
+        triplets = Triplets(capacity=9 * mesh.Ntri, shape=(mesh.Npts, mesh.Npts))
+    triplets.extend_blocks(mesh.triangle_nodes, element_matrices(mesh, stiffness, mass))
+    return triplets
+
+
+def assemble_load_vector(mesh, f, order: int = 2) -> np.ndarray:
+    """
+    Assemble le second membre b_i = somme sur les triangles de l'intégrale de f * phi_i, élément par élément.
+    f est évaluée en une seule fois sur tous les points de quadrature de tous les triangles et les fonctions de forme
+    de référence ne sont tabulées qu'une fois.
+    :param mesh: le maillage considéré
+    :param f: la fonction source f(x, y), qui doit accepter des tableaux numpy
+    :param order: le degré de la règle de quadrature (voir fem_utils.quadrature)
+    :return: tableau (Npts,)
+    """
+    local = element_load_vectors(mesh.geometry, f, order)
+    return np.bincount(mesh.triangle_nodes.ravel(), weights=local.ravel(), minlength=mesh.Npts)
+
+
+def element_load_vectors(geometry: Geometry, f, order: int = 2) -> np.ndarray:
+    """
+    Contributions élémentaires du second membre, intégrale de f * phi_i sur chaque triangle
+    :param geometry: la géométrie des triangles (Mesh.geometry)
+    :param f: la fonction source f(x, y), qui doit accepter des tableaux numpy
+    :param order: le degré de la règle de quadrature (voir fem_utils.quadrature)
+    :return: tableau (Ntri, 3)
+    """
+    points, weights = fem_utils.quadrature(order)
+    shape = fem_utils.reference_shape_values(points) # (nq, 3)
+    # coordonnées physiques des points de quadrature (Ntri, nq, 2), images des points de référence par x = p1 + J (eta, nu)
+    quad = geometry.origin[:, None, :] + np.einsum("tab,qb->tqa", geometry.jacobian, points)
+    values = np.broadcast_to(f(quad[..., 0], quad[..., 1]), quad.shape[:2])
+    return (2 * geometry.area)[:, None] * ((values * weights) @ shape)
+
+
+def assemble_load_vectors(mesh, sources, order: int = 2, mass: csr_matrix = None) -> np.ndarray:
+    """
+    Assemble en un seul bloc les seconds membres de plusieurs sources, pour les résoudre tous avec la même
+    factorisation
+    :param mesh: le maillage considéré
+    :param sources: au choix
+        - une liste de k fonctions f(x, y) acceptant des tableaux numpy ;
+        - un tableau (Npts,) ou (Npts, k) de valeurs aux points, la source est alors l'interpolée P1 et
+          b = M @ valeurs ;
+        - un tableau (Ntri, nq, k) de valeurs aux points de quadrature de la règle d'ordre order.
+    :param order: le degré de la règle de quadrature (voir fem_utils.quadrature)
+    :param mass: la matrice de masse déjà assemblée, à donner pour ne pas la réassembler à chaque appel avec des
+    valeurs aux points
+    :return: tableau (Npts, k)
+    """
+    geometry = mesh.geometry
+    if not isinstance(sources, np.ndarray):
+        points, _ = fem_utils.quadrature(order)
+        quad = geometry.origin[:, None, :] + np.einsum("tab,qb->tqa", geometry.jacobian, points)
+        sources = np.stack([np.broadcast_to(f(quad[..., 0], quad[..., 1]), quad.shape[:2]) for f in sources], axis=2)
+    if sources.ndim == 1: # une seule source donnée par ses valeurs aux points
+        sources = sources.reshape(-1, 1)
+    if sources.ndim == 2:
+        if mass is None:
+            mass = assemble(mesh, stiffness=0, mass=1).tocsr()
+        return mass @ sources
+    points, weights = fem_utils.quadrature(order)
+    shape = fem_utils.reference_shape_values(points)
+    local = np.einsum("tqk,q,qi->tik", sources, weights, shape) * (2 * geometry.area)[:, None, None]
+    # matrice creuse (Npts, 3 Ntri) qui somme chaque contribution élémentaire sur son point, appliquée aux k colonnes
+    scatter = csr_matrix((np.ones(3 * mesh.Ntri), (mesh.triangle_nodes.ravel(), np.arange(3 * mesh.Ntri))),
+                         shape=(mesh.Npts, 3 * mesh.Ntri))
+    return scatter @ local.reshape(3 * mesh.Ntri, -1)
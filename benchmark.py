@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+
+import assembly
+import boundary
+import evaluation
+import mesh_generation
+import msh_writer
+import solvers
+from mesh import Mesh
+
+
+def source(x, y):
+    """
+    Même second membre que dans main.py
+    """
+    return 1 / np.pi ** 2 * np.exp(-((x - 0.5) ** 2 + (y - 0.5) ** 2))
+
+
+def measure(stage, repeat: int) -> tuple[float, int, object]:
+    """
+    Mesure une étape : le meilleur temps sur repeat exécutions, puis le pic de mémoire allouée (via tracemalloc, qui
+    suit aussi les tableaux numpy) sur une exécution supplémentaire, séparée pour ne pas fausser les temps
+    :param stage: fonction sans paramètre qui exécute l'étape
+    :param repeat: nombre d'exécutions chronométrées
+    :return: (temps en secondes, pic de mémoire en octets, résultat de l'étape)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = stage()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    stage()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def run_case(kind: str, n: int, repeat: int, probes: int, workdir: str, seed: int) -> list[dict]:
+    """
+    Exécute toutes les étapes de main.py sur un maillage synthétique
+    :return: une ligne de résultats par étape
+    """
+    mesh = mesh_generation.structured_square(n) if kind == "structured" else \
+        mesh_generation.unstructured_square(n, seed=seed)
+    filename = os.path.join(workdir, f"{kind}-{n}.msh")
+    msh_writer.write_msh(mesh, filename)
+    cache = os.path.join(workdir, "cache")
+    Mesh().GmshToMesh(filename, backend="native", cache_dir=cache) # remplit le cache avant de le mesurer
+    probe_points = np.random.default_rng(seed).uniform(0, 1, size=(probes, 2))
+    state = {}
+
+    def read_native():
+        m = Mesh()
+        m.GmshToMesh(filename, backend="native")
+        return m
+
+    def read_cache():
+        m = Mesh()
+        m.GmshToMesh(filename, backend="native", cache_dir=cache)
+        return m
+
+    def assemble():
+        mesh.invalidate_geometry() # la géométrie fait partie du coût de l'assemblage
+        return assembly.assemble(mesh).tocsr()
+
+    def dirichlet():
+        return boundary.apply_dirichlet(state["A"], state["b"], boundary.dirichlet_nodes(mesh), 0)
+
+    stages = [("read_native", read_native),
+              ("read_cache", read_cache),
+              ("assembly", assemble),
+              ("rhs", lambda: assembly.assemble_load_vector(mesh, source)),
+              ("dirichlet", dirichlet),
+              ("solve_direct", lambda: solvers.Solver(state["A_bc"], "direct").solve(state["b_bc"])),
+              ("solve_cg", lambda: solvers.Solver(state["A_bc"], "cg", "jacobi", rtol=1e-8).solve(state["b_bc"])),
+              ("evaluation", lambda: evaluation.FESolution(mesh, state["U"])(probe_points[:, 0], probe_points[:, 1]))]
+    rows = []
+    for name, stage in stages:
+        seconds, peak, result = measure(stage, repeat)
+        if name == "assembly":
+            state["A"] = result
+        elif name == "rhs":
+            state["b"] = result
+        elif name == "dirichlet":
+            state["A_bc"], state["b_bc"] = result
+        elif name == "solve_direct":
+            state["U"] = result
+        rows.append({"mesh": kind, "n": n, "Npts": mesh.Npts, "Ntri": mesh.Ntri, "stage": name,
+                     "seconds": seconds, "peak_bytes": peak,
+                     "elements_per_s": mesh.Ntri / seconds if seconds > 0 else None,
+                     "dofs_per_s": mesh.Npts / seconds if seconds > 0 else None})
+    return rows
+
+
+def metadata(seed: int) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "scipy": scipy.__version__, "platform": platform.platform(), "cpu_count": os.cpu_count(), "seed": seed}
+
+
+def compare(results: list[dict], reference: list[dict], threshold: float) -> list[str]:
+    """
+    Compare deux séries de mesures étape par étape
+    :return: la liste des étapes plus lentes que la référence d'un facteur supérieur à threshold
+    """
+    previous = {(r["mesh"], r["n"], r["stage"]): r["seconds"] for r in reference}
+    regressions = []
+    for r in results:
+        key = (r["mesh"], r["n"], r["stage"])
+        if key in previous and previous[key] > 0 and r["seconds"] / previous[key] > threshold:
+            regressions.append(f"{key[0]} n={key[1]} {key[2]} : {previous[key]:.4g} s -> {r['seconds']:.4g} s")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mesure les étapes de la résolution sur des maillages synthétiques "
+                                                 "du carré unité de tailles croissantes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 32, 64, 128, 256],
+                        help="nombres de subdivisions par côté")
+    parser.add_argument("--kinds", nargs="+", choices=["structured", "unstructured"],
+                        default=["structured", "unstructured"])
+    parser.add_argument("--repeat", type=int, default=3, help="nombre de mesures par étape (on garde la meilleure)")
+    parser.add_argument("--probes", type=int, default=100000, help="nombre de points où évaluer la solution")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="fichier json où écrire les résultats (sortie standard par défaut)")
+    parser.add_argument("--compare", help="fichier json d'une exécution précédente à comparer")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="facteur de ralentissement au-delà duquel une étape est signalée")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for kind in args.kinds:
+            for n in args.sizes:
+                results += run_case(kind, n, args.repeat, args.probes, workdir, args.seed)
+    report = {"metadata": metadata(args.seed), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for line in regressions:
+            print("régression :", line, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+
+
+def dirichlet_nodes(mesh, physical_tag: int = 0) -> np.ndarray:
+    """
+    Récupère les points des segments de bord portant le tag physique donné, lus dans l'index des bords de la
+    topologie du maillage (aucun parcours des segments une fois la topologie construite)
+    :param mesh: le maillage considéré
+    :param physical_tag: le tag physique des segments où s'applique la condition (0 pour le bord du carré)
+    :return: tableau trié des id des points, chaque point n'apparaît qu'une fois même s'il est partagé par deux
+    segments
+    """
+    return mesh.topology.boundary_nodes_of(physical_tag)
+
+
+def dirichlet_values(mesh, nodes: np.ndarray, g) -> np.ndarray:
+    """
+    Valeurs imposées sur les points de Dirichlet
+    :param mesh: le maillage considéré
+    :param nodes: les id des points de Dirichlet
+    :param g: une constante, un tableau de valeurs (une par point) ou une fonction g(x, y) acceptant des tableaux
+    :return: tableau de la taille de nodes
+    """
+    if callable(g):
+        x, y = mesh.coords[nodes].T
+        return np.broadcast_to(g(x, y), nodes.shape).astype(float)
+    return np.broadcast_to(np.asarray(g, dtype=float), nodes.shape)
+
+
+def apply_dirichlet(A, b: np.ndarray, nodes: np.ndarray, values=0.0) -> tuple[csr_matrix, np.ndarray]:
+    """
+    Applique la condition u = values sur les points nodes par élimination des lignes et des colonnes.
+    La condition non homogène est prise en compte par relèvement : b - A g où g vaut values sur les points de
+    Dirichlet et 0 ailleurs. La matrice obtenue reste symétrique (donc utilisable avec le gradient conjugué) et le
+    coût est en O(nnz), indépendant du nombre de segments de bord.
+    :param A: la matrice assemblée (format scipy.sparse)
+    :param b: le second membre, de forme (N,) ou (N, k)
+    :param nodes: les id des points de Dirichlet
+    :param values: valeurs imposées, une constante ou un tableau de la taille de nodes
+    :return: (A, b) modifiés, A au format CSR
+    """
+    A = coo_matrix(A)
+    n = A.shape[0]
+    is_dirichlet = np.zeros(n, dtype=bool)
+    is_dirichlet[nodes] = True
+    g = np.zeros(n)
+    g[nodes] = values
+    b = lift_rhs(b, A @ g, nodes, g[nodes])
+    keep = ~(is_dirichlet[A.row] | is_dirichlet[A.col]) # on supprime les lignes et colonnes des points de Dirichlet
+    rows = np.concatenate((A.row[keep], nodes))
+    cols = np.concatenate((A.col[keep], nodes))
+    data = np.concatenate((A.data[keep], np.ones(len(nodes))))
+    return csr_matrix((data, (rows, cols)), shape=A.shape), b
+
+
+def lift_rhs(b: np.ndarray, lift: np.ndarray, nodes: np.ndarray, values=0.0) -> np.ndarray:
+    """
+    Partie de apply_dirichlet qui ne concerne que le second membre : b - A g puis b = values sur les points de
+    Dirichlet. Le relèvement lift = A g ne dépend pas de b, on peut donc le calculer une fois et l'appliquer à autant de
+    seconds membres que l'on veut.
+    :param b: le second membre, de forme (N,) ou (N, k)
+    :param lift: le vecteur A g, de forme (N,), calculé avec la matrice avant élimination
+    :param nodes: les id des points de Dirichlet
+    :param values: valeurs imposées, une constante ou un tableau de la taille de nodes
+    :return: le second membre modifié (copie)
+    """
+    b = np.array(b, dtype=float) # copie, le second membre de l'appelant n'est pas modifié
+    values = np.broadcast_to(np.asarray(values, dtype=float), nodes.shape)
+    b -= lift if b.ndim == 1 else lift[:, None]
+    b[nodes] = values if b.ndim == 1 else values[:, None]
+    return b
+
+
+def reduce_system(A, b: np.ndarray, nodes: np.ndarray, values=0.0) -> tuple[csr_matrix, np.ndarray, np.ndarray]:
+    """
+    Variante de apply_dirichlet qui retire complètement les inconnues de Dirichlet : on ne garde que le système
+    A_ff u_f = b_f - A_fd g_d sur les points libres
+    :param A: la matrice assemblée (format scipy.sparse)
+    :param b: le second membre, de forme (N,) ou (N, k)
+    :param nodes: les id des points de Dirichlet
+    :param values: valeurs imposées, une constante ou un tableau de la taille de nodes
+    :return: (A_ff, b_f, free) où free contient les id des points libres
+    """
+    A = csr_matrix(A)
+    free = np.setdiff1d(np.arange(A.shape[0]), nodes)
+    g = np.broadcast_to(np.asarray(values, dtype=float), nodes.shape)
+    lift = A[free][:, nodes] @ g
+    b_free = np.asarray(b, dtype=float)[free]
+    b_free = b_free - (lift if b_free.ndim == 1 else lift[:, None])
+    return A[free][:, free], b_free, free
+
+
+def expand_solution(u_free: np.ndarray, free: np.ndarray, nodes: np.ndarray, values=0.0) -> np.ndarray:
+    """
+    Reconstruit la solution sur tous les points à partir de la solution du système réduit
+    :param u_free: solution sur les points libres, de forme (Nfree,) ou (Nfree, k)
+    :param free: les id des points libres
+    :param nodes: les id des points de Dirichlet
+    :param values: valeurs imposées sur les points de Dirichlet
+    :return: tableau (N,) ou (N, k)
+    """
+    u = np.empty((len(free) + len(nodes),) + u_free.shape[1:])
+    u[free] = u_free
+    values = np.asarray(values, dtype=float)
+    u[nodes] = values if values.ndim == 0 or u.ndim == 1 else values[:, None]
+    return u
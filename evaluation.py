@@ -0,0 +1,117 @@
+import numpy as np
+
+
+class PointLocator:
+    def __init__(self, mesh, cells_per_axis: int = None):
+        """
+        Index spatial des triangles d'un maillage : une grille régulière de cases couvrant la boîte englobante, chaque
+        case connaissant les triangles dont la boîte englobante la touche. L'index est construit une seule fois, en
+        vectorisé, puis permet de localiser des lots entiers de points sans boucle Python sur les points.
+        :param mesh: le maillage considéré
+        :param cells_per_axis: nombre de cases par direction, par défaut environ sqrt(Ntri) ce qui donne quelques
+        triangles par case
+        """
+        self.mesh = mesh
+        coords, connectivity = mesh.coords, mesh.triangle_nodes
+        vertices = coords[connectivity] # (Ntri, 3, 2)
+        self.origin : np.ndarray = coords.min(axis=0)
+        extent = np.maximum(coords.max(axis=0) - self.origin, np.finfo(float).tiny)
+        self.n : int = cells_per_axis or max(1, int(np.sqrt(mesh.Ntri)))
+        self.cell_size : np.ndarray = extent / self.n
+
+        # inverse de la jacobienne de chaque triangle pour calculer les coordonnées barycentriques
+        self.first_vertex : np.ndarray = mesh.geometry.origin
+        self.inverse_jacobian : np.ndarray = mesh.geometry.inverse_jacobian
+
+        # cases couvertes par la boîte englobante de chaque triangle
+        low = self._cell(vertices.min(axis=1))
+        high = self._cell(vertices.max(axis=1))
+        span = high - low + 1
+        count = span[:, 0] * span[:, 1]
+        triangles = np.repeat(np.arange(mesh.Ntri), count)
+        # rang de chaque couple (triangle, case) parmi les cases de son triangle
+        rank = np.arange(len(triangles)) - np.repeat(np.cumsum(count) - count, count)
+        cx = low[triangles, 0] + rank % span[triangles, 0]
+        cy = low[triangles, 1] + rank // span[triangles, 0]
+        cells = cx * self.n + cy
+        # stockage CSR : les triangles de la case c sont cell_triangles[cell_start[c]:cell_start[c+1]]
+        order = np.argsort(cells, kind="stable")
+        self.cell_triangles : np.ndarray = triangles[order].astype(np.int32)
+        self.cell_start : np.ndarray = np.zeros(self.n * self.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.n * self.n), out=self.cell_start[1:])
+
+    def _cell(self, points: np.ndarray) -> np.ndarray:
+        """
+        Indices (i, j) de la case qui contient chaque point, les points hors de la boîte sont ramenés au bord
+        """
+        return np.clip(((points - self.origin) / self.cell_size).astype(np.int64), 0, self.n - 1)
+
+    def barycentric(self, triangles: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """
+        Coordonnées barycentriques des points dans les triangles correspondants
+        :param triangles: tableau (n,) des indices de triangles
+        :param points: tableau (n, 2) des points
+        :return: tableau (n, 3), qui vaut (psi1, psi2, psi3) au point considéré
+        """
+        eta_nu = np.einsum("nab,nb->na", self.inverse_jacobian[triangles], points - self.first_vertex[triangles])
+        return np.column_stack((1 - eta_nu.sum(axis=1), eta_nu))
+
+    def locate(self, points: np.ndarray, epsilon: float = 1e-10) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Trouve le triangle qui contient chaque point. On teste en bloc le k-ième candidat de la case de chaque point
+        encore non localisé, le nombre de passes est donc le nombre maximal de triangles par case.
+        :param points: tableau (n, 2) des points à localiser
+        :param epsilon: tolérance sur les coordonnées barycentriques, pour accepter les points sur les arêtes
+        :return: (triangles, barycentriques) où triangles vaut -1 pour les points hors du maillage
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        cell = self._cell(points)
+        cell = cell[:, 0] * self.n + cell[:, 1]
+        start, stop = self.cell_start[cell], self.cell_start[cell + 1]
+        found = np.full(len(points), -1, dtype=np.int64)
+        bary = np.zeros((len(points), 3))
+        pending = np.flatnonzero(stop > start)
+        k = 0
+        while len(pending) > 0:
+            candidates = self.cell_triangles[start[pending] + k]
+            lam = self.barycentric(candidates, points[pending])
+            inside = (lam >= -epsilon).all(axis=1)
+            found[pending[inside]] = candidates[inside]
+            bary[pending[inside]] = lam[inside]
+            k += 1
+            pending = pending[~inside]
+            pending = pending[start[pending] + k < stop[pending]]
+        return found, bary
+
+
+class FESolution:
+    def __init__(self, mesh, U: np.ndarray, locator: PointLocator = None):
+        """
+        Solution éléments finis P1 que l'on peut évaluer en n'importe quel point : on localise le triangle qui
+        contient le point puis on interpole les valeurs aux sommets avec les coordonnées barycentriques
+        :param mesh: le maillage considéré
+        :param U: les valeurs de la solution aux points du maillage, de forme (Npts,) ou (Npts, 1)
+        :param locator: un index spatial déjà construit sur ce maillage, à réutiliser s'il existe
+        """
+        self.mesh = mesh
+        self.U : np.ndarray = np.asarray(U, dtype=float).reshape(mesh.Npts, -1)
+        self.locator : PointLocator = locator if locator is not None else PointLocator(mesh)
+
+    def __call__(self, x, y, fill_value: float = np.nan):
+        """
+        Évalue la solution en un point ou en un tableau de points
+        :param x: abscisse(s)
+        :param y: ordonnée(s), de même forme que x
+        :param fill_value: valeur renvoyée pour les points hors du maillage
+        :return: un float pour des scalaires, sinon un tableau de même forme que x
+        """
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        triangles, bary = self.locator.locate(np.column_stack((x.ravel(), y.ravel())))
+        inside = triangles >= 0
+        values = np.full((len(triangles), self.U.shape[1]), fill_value)
+        nodes = self.mesh.triangle_nodes[triangles[inside]]
+        values[inside] = np.einsum("ni,nik->nk", bary[inside], self.U[nodes])
+        values = values.reshape(x.shape + (self.U.shape[1],))
+        if self.U.shape[1] == 1:
+            values = values[..., 0]
+        return values[()] if values.ndim == 0 else values
@@ -1,3 +1,4 @@
+from itertools import permutations
 from typing import Callable
 
 import numpy as np
@@ -45,6 +46,47 @@ def grad_phi(i:int) -> np.array:
         case 2:
             return np.array([[0], [1]])
 
+# Règles de quadrature de Dunavant sur le triangle, indexées par leur degré d'exactitude. Chaque règle est une liste
+# de (coordonnées barycentriques, poids) où le poids est partagé par toutes les permutations des coordonnées et où
+# la somme des poids vaut 1 (on multiplie ensuite par l'aire 1/2 du triangle de référence).
+DUNAVANT_RULES = {
+    1: [((1/3, 1/3, 1/3), 1.0)],
+    2: [((2/3, 1/6, 1/6), 1/3)],
+    3: [((1/3, 1/3, 1/3), -27/48), ((0.6, 0.2, 0.2), 25/48)],
+    4: [((0.108103018168070, 0.445948490915965, 0.445948490915965), 0.223381589678011),
+        ((0.816847572980459, 0.091576213509771, 0.091576213509771), 0.109951743655322)],
+    5: [((1/3, 1/3, 1/3), 0.225),
+        ((0.059715871789770, 0.470142064105115, 0.470142064105115), 0.132394152788506),
+        ((0.797426985353087, 0.101286507323456, 0.101286507323456), 0.125939180544827)],
+}
+
+def quadrature(order:int=2) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Points et poids de la règle de Dunavant exacte pour les polynômes de degré order sur le triangle de référence
+    (1, 3, 4, 6 ou 7 points pour les degrés 1 à 5)
+    :param order: le degré d'exactitude voulu
+    :return: (points, poids) avec points de forme (nq, 2) en coordonnées paramétriques (eta, nu) et poids de forme
+    (nq,) dont la somme vaut 1/2
+    """
+    if order not in DUNAVANT_RULES:
+        raise ValueError(f"pas de règle de quadrature d'ordre {order}, ordres disponibles : {sorted(DUNAVANT_RULES)}")
+    points, weights = [], []
+    for barycentric, weight in DUNAVANT_RULES[order]:
+        # les permutations distinctes des coordonnées barycentriques (1, 3 ou 6 selon les symétries), dans un ordre fixe
+        for lam in dict.fromkeys(permutations(barycentric)):
+            points.append((lam[1], lam[2])) # eta et nu sont les deux dernières coordonnées barycentriques
+            weights.append(weight / 2)
+    return np.array(points), np.array(weights)
+
+def reference_shape_values(points:np.ndarray) -> np.ndarray:
+    """
+    Tabule les trois fonctions de forme du triangle de référence sur un ensemble de points paramétriques
+    :param points: tableau (nq, 2) des points (eta, nu)
+    :return: tableau (nq, 3) dont la colonne i est psi(eta, nu, i+1)
+    """
+    eta, nu = points[:, 0], points[:, 1]
+    return np.stack((1 - eta - nu, eta, nu), axis=1)
+
 def psi(eta:float, nu:float, i:int) -> float:
     """
     Calcul de la i-ème fonction de référence en fonction des coordonnées paramétriques
@@ -0,0 +1,49 @@
+import numpy as np
+
+# Gradients des trois fonctions de forme du triangle de référence (une ligne par fonction), ce sont les mêmes
+# vecteurs que ceux renvoyés par fem_utils.grad_phi mais rangés dans un seul tableau (3, 2)
+REF_GRADIENTS = np.array([[-1.0, -1.0], [1.0, 0.0], [0.0, 1.0]])
+
+
+class Geometry:
+    def __init__(self, coords: np.ndarray, connectivity: np.ndarray):
+        """
+        Grandeurs géométriques de tous les triangles, calculées une seule fois et de façon vectorisée. Mesh en garde
+        une instance (Mesh.geometry) que toutes les routines d'assemblage et de quadrature lisent au lieu de
+        recalculer aires et jacobiens.
+        :param coords: tableau (Npts, 2) des coordonnées des points
+        :param connectivity: tableau (Ntri, 3) des sommets de chaque triangle
+        """
+        p1 = coords[connectivity[:, 0]]
+        # jacobienne du changement de variable depuis le triangle de référence, de colonnes (p2 - p1) et (p3 - p1)
+        self.jacobian : np.ndarray = np.stack((coords[connectivity[:, 1]] - p1, coords[connectivity[:, 2]] - p1), axis=2)
+        self.origin : np.ndarray = p1 # image du point (0, 0) du triangle de référence
+        jac = self.jacobian
+        # déterminant signé : positif si le triangle est orienté dans le sens trigonométrique
+        self.det : np.ndarray = jac[:, 0, 0] * jac[:, 1, 1] - jac[:, 0, 1] * jac[:, 1, 0]
+        self.area : np.ndarray = np.abs(self.det) / 2
+        # Bp = J^(-T), qui transforme les gradients de référence en gradients sur le triangle
+        Bp = np.empty_like(jac)
+        Bp[:, 0, 0] = jac[:, 1, 1]
+        Bp[:, 0, 1] = -jac[:, 1, 0]
+        Bp[:, 1, 0] = -jac[:, 0, 1]
+        Bp[:, 1, 1] = jac[:, 0, 0]
+        Bp /= self.det[:, None, None]
+        self.Bp : np.ndarray = Bp
+        # gradients physiques des trois fonctions de forme de chaque triangle (Ntri, 3, 2)
+        self.gradients : np.ndarray = np.einsum("tab,ib->tia", Bp, REF_GRADIENTS)
+
+    @property
+    def inverse_jacobian(self) -> np.ndarray:
+        """
+        J^(-1), qui envoie un point du triangle (moins origin) sur ses coordonnées paramétriques (eta, nu)
+        :return: tableau (Ntri, 2, 2)
+        """
+        return self.Bp.transpose(0, 2, 1)
+
+    def stiffness(self) -> np.ndarray:
+        """
+        Produits des gradients pondérés par l'aire, c'est-à-dire les matrices de rigidité élémentaires
+        :return: tableau (Ntri, 3, 3)
+        """
+        return self.area[:, None, None] * np.einsum("tia,tja->tij", self.gradients, self.gradients)
@@ -0,0 +1,116 @@
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource # n'existe que sous Unix
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss() -> int:
+    """
+    Pic de mémoire résidente du processus depuis son lancement
+    :return: en octets, ou None si la plateforme ne le fournit pas
+    """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024 # en octets sous macOS, en kilo-octets ailleurs
+
+
+class Instrumentation:
+    def __init__(self, enabled: bool = True, track_allocations: bool = False, profile_stage: str = None,
+                 profile_path: str = None):
+        """
+        Mesures par étape de la résolution. Chaque étape est encadrée par un bloc `with instrumentation.stage(nom)` qui
+        relève le temps écoulé, le temps CPU et le pic de mémoire résidente ; l'étape peut y ajouter ses propres
+        compteurs (nombre d'éléments, nnz...). Désactivée, l'instrumentation ne fait rien d'autre qu'entrer et sortir
+        du bloc.
+        :param enabled: active les mesures
+        :param track_allocations: mesure aussi les allocations de chaque étape avec tracemalloc (plus coûteux)
+        :param profile_stage: nom de l'étape à profiler avec cProfile
+        :param profile_path: fichier où enregistrer le profil (lisible avec pstats ou snakeviz), sinon un résumé
+        texte est ajouté aux mesures de l'étape
+        """
+        self.enabled : bool = enabled
+        self.track_allocations : bool = track_allocations
+        self.profile_stage : str = profile_stage
+        self.profile_path : str = profile_path
+        self.records : list[dict] = [] # une entrée par étape, dans l'ordre d'exécution
+
+    @contextmanager
+    def stage(self, name: str, **counters):
+        """
+        Mesure une étape
+        :param name: nom de l'étape
+        :param counters: compteurs connus dès le début de l'étape
+        :return: le dictionnaire des mesures de l'étape, que l'étape peut compléter
+        """
+        record = {"stage": name, **counters}
+        if not self.enabled:
+            yield record
+            return
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+        tracing = self.track_allocations and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.track_allocations:
+            tracemalloc.reset_peak()
+            allocated = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.process_time() - cpu
+            record["peak_rss_bytes"] = peak_rss()
+            if self.track_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                record["allocated_bytes"] = current - allocated
+                record["peak_allocated_bytes"] = peak - allocated
+                if tracing:
+                    tracemalloc.stop()
+            if profiler is not None:
+                self._save_profile(profiler, record)
+            self.records.append(record)
+            logger.info("%s", json.dumps(record))
+
+    def _save_profile(self, profiler: cProfile.Profile, record: dict) -> None:
+        if self.profile_path is not None:
+            profiler.dump_stats(self.profile_path)
+            record["profile"] = self.profile_path
+        else:
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(20)
+            record["profile"] = text.getvalue()
+
+    def report(self) -> dict:
+        """
+        :return: les mesures de toutes les étapes et leur total
+        """
+        return {"stages": self.records,
+                "total": {"wall_s": sum(r.get("wall_s", 0) for r in self.records),
+                          "cpu_s": sum(r.get("cpu_s", 0) for r in self.records),
+                          "peak_rss_bytes": peak_rss()}}
+
+    def write_json(self, filename: str) -> None:
+        """
+        Écrit le rapport au format json
+        :param filename: le nom du fichier
+        :return: None
+        """
+        with open(filename, "w") as f:
+            json.dump(self.report(), f, indent=2)
@@ -1,127 +1,105 @@
-import numpy as np
-from matplotlib import pyplot as plt
-from scipy.sparse import coo_matrix, csr_matrix
-
-import fem_utils
-from mesh import Mesh
-from triplets import Triplets
-
-mesh = Mesh()
-# Mise en mémoire du maillage 2d crée par gmsh
-mesh.GmshToMesh("square.msh")
+import argparse
+import importlib
+import logging
+import sys
 
-# Initialisation l'algorithme d'assemblage
-triplets_A = Triplets()
-
-# Remplissage de la matrice A en commençant par calculer les éléments de masse élémentaire
-for triangle in mesh.triangles:
-    elementary_mass_matrix = (abs(triangle.area())/12) * np.array([[2,1,1],[1,2,1],[1,1,2]])
-    for i in range(3):
-        for j in range(3):
-            triplets_A.append(triangle.get_boundary(i).get_id(), triangle.get_boundary(j).get_id(),0* elementary_mass_matrix[i][j])
+import numpy as np
 
-# Calcul des éléments de masse élémentaire pour la matrice de rigidité
+from instrumentation import Instrumentation
+from pipeline import Pipeline
 
-for triangle in mesh.triangles:
-    x1,y1 = triangle.get_boundary(1).get_coord()
-    x2,y2 = triangle.get_boundary(2).get_coord()
-    x3,y3 = triangle.get_boundary(3).get_coord()
-    Bp = (1/triangle.jac())*np.array([[(y3-y1),(y1-y2)],[(x1-x3),(x2-x1)]])
-    for i in range(3):
-        for j in range(3):
-            elementary_rigid_composant= triangle.area() * fem_utils.grad_phi(j).transpose() @ (Bp.transpose() @ Bp) @ fem_utils.grad_phi(i)
-            triplets_A.append(triangle.get_boundary(i).get_id(), triangle.get_boundary(j).get_id(), elementary_rigid_composant[0][0])
 
 # Implémentation du second membre de l'équation différentielle aux dérivées partielles
 def f(x,y):
     A = 1 / (1*np.pi ** 2)
     return A *  np.exp(-((x - 0.5)**2 + (y - 0.5)**2) / 1**2)
 
-# Calcul du second membre du système linéaire
-B = np.zeros((144,1)).transpose()
-for point in mesh.points:
-    for triangle in mesh.triangles:
-        if point in triangle.points:
-            sum = 0
-            for i in range(1,4):
-                eta_list, nu_list, omega_list, gauss_point_list = triangle.gaussPoint()
-                for eta, nu, omega, gauss_point in zip(eta_list, nu_list, omega_list, gauss_point_list):
-
-                    sum += omega*f(gauss_point[0][0], gauss_point[0][1])*fem_utils.phi_ref(triangle, eta, nu,i)
-    B[0][point.get_id()] += sum*abs(triangle.jac())
-
-# Application de la condition de Dirichlet:
-for segment in mesh.segments:
-    if segment.physical_tag == 0:
-        id1 = segment.get_boundary(1).get_id()
-        id2 = segment.get_boundary(2).get_id()
-        for i in range(len(triplets_A.getData()[0])):
-            if triplets_A.getData()[1][0][i] == id1 or triplets_A.getData()[1][0][i] == id2 :
-                triplets_A.getData()[0][i] = 0
-        triplets_A.append(id1, id1, 1)
-        triplets_A.append(id2, id2, 1)
-        B[0][id1] = 0
-        B[0][id2] = 0
-
-# Transformation du jeu de données en une matrice COO pour pouvoir la convertir en matrice CSR et réaliser les
-# calculs.
-A_COO = coo_matrix(triplets_A.getData())
-A_csr = csr_matrix(A_COO)
-
-# Calcul et stockage d'une base de l'espace approché
-phi = [None for i in range(mesh.Npts)]
-node_check = []
-for triangle in mesh.triangles:
-    id1 = triangle.gset_boundary(1).get_id()
-    id2 = triangle.get_boundary(2).get_id()
-    id3 = triangle.get_boundary(3).get_id()
-    if id1 not in node_check:
-        phi[id1-1] = fem_utils.get_shape_functions(triangle,1)
-        node_check.append(id1)
-    if id2 not in node_check:
-        phi[id2-1] = fem_utils.get_shape_functions(triangle,2)
-        node_check.append(id2)
-    if id3 not in node_check:
-        phi[id3-1] = fem_utils.get_shape_functions(triangle,3)
-        node_check.append(id3)
-
-# Calcul de la solution approchée
-U = np.linalg.solve(A_csr.toarray(), B.transpose())
-
-def sol(x,y):
-    result = 0
-    for i in range(1,mesh.Npts):
-        result += U[i] * phi[i](x,y)
-    return result
-
-def plot_solution_on_grid(mesh, sol_func, title="Solution sur grille"):
-
-    # Extraction des points du domaine pour l'affichage graphique
-    x_coords = [p.x for p in mesh.points]
-    y_coords = [p.y for p in mesh.points]
-    xmin, xmax = min(x_coords), max(x_coords)
-    ymin, ymax = min(y_coords), max(y_coords)
-
-    # Création d'une grille régulière
-    N = 100  # plus grand = plus fin
-    X, Y = np.meshgrid(np.linspace(xmin, xmax, N),
-                       np.linspace(ymin, ymax, N))
-
-    # Évaluation de la solution sur la grille
-    Z = np.vectorize(sol_func)(X, Y)
-
-    # Traçage de la surface
-    fig = plt.figure(figsize=(10, 8))
-    ax = fig.add_subplot(111, projection='3d')
-    surf = ax.plot_surface(X, Y, Z, cmap='viridis', edgecolor='none')
-
-    ax.set_xlabel('x')
-    ax.set_ylabel('y')
-    ax.set_zlabel('sol(x, y)')
-    ax.set_title(title)
-    fig.colorbar(surf, ax=ax, shrink=0.5, aspect=10)
-
-    plt.tight_layout()
-    plt.show()
 
-plot_solution_on_grid(mesh, sol) # affichage graphique
+def load_source(spec: str):
+    """
+    Retrouve la fonction source à partir de son nom
+    :param spec: "module:fonction", par exemple "main:f"
+    :return: la fonction
+    """
+    module, _, name = spec.partition(":")
+    if module in ("", "main", "__main__"):
+        return globals()[name or "f"]
+    return getattr(importlib.import_module(module), name)
+
+
+def write_outputs(pipeline: Pipeline, args) -> None:
+    """
+    Écrit la solution dans les formats demandés, puis l'affiche si un tracé est demandé. Les formats de sortie et
+    matplotlib ne sont importés que s'ils servent.
+    """
+    mesh, U = pipeline.mesh, pipeline.U
+    if args.vtu or args.xdmf:
+        import output
+        with pipeline.instrumentation.stage("output", Npts=mesh.Npts):
+            if args.vtu:
+                output.write_vtu(mesh, args.vtu, {"u": U})
+            if args.xdmf:
+                output.write_xdmf(mesh, args.xdmf, {"u": U})
+    if args.msh:
+        import msh_writer
+        with pipeline.instrumentation.stage("output", Npts=mesh.Npts):
+            msh_writer.write_msh(mesh, args.msh, node_data={"u": U})
+    if args.plot != "none":
+        import output
+        with pipeline.instrumentation.stage("plot", Ntri=mesh.Ntri):
+            output.plot_solution(mesh, U, kind=args.plot, title="Solution", filename=args.plot_file)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Résout -Δu = f avec u = g au bord par éléments finis P1")
+    parser.add_argument("mesh", nargs="?", default="square.msh", help="fichier .msh du maillage")
+    parser.add_argument("--source", default="main:f", help="fonction source, sous la forme module:fonction")
+    parser.add_argument("--backend", choices=["gmsh", "native"], default="gmsh", help="lecteur du maillage")
+    parser.add_argument("--cache-dir", default=".mesh_cache",
+                        help="dossier du cache binaire du maillage ('' pour le désactiver)")
+    parser.add_argument("--method", choices=["direct", "cg"], default="direct", help="méthode de résolution")
+    parser.add_argument("--preconditioner", choices=["jacobi", "ilu", "none"], default="jacobi",
+                        help="préconditionneur du gradient conjugué")
+    parser.add_argument("--order", type=int, default=2, help="degré de la quadrature du second membre")
+    parser.add_argument("--dirichlet-tag", type=int, default=0, help="tag physique du bord où u = g")
+    parser.add_argument("--g", type=float, default=0.0, help="valeur imposée au bord")
+    parser.add_argument("--renumber", choices=["rcm"], help="renumérotation des points avant l'assemblage")
+    parser.add_argument("--workers", type=int,
+                        help="nombre de processus pour l'assemblage (dans le processus courant par défaut)")
+    parser.add_argument("--vtu", help="fichier .vtu où écrire la solution")
+    parser.add_argument("--xdmf", help="fichier .xdmf où écrire la solution (tableaux binaires à côté)")
+    parser.add_argument("--msh", help="fichier .msh où écrire le maillage et la solution ($NodeData)")
+    parser.add_argument("--plot", choices=["trisurf", "tripcolor", "none"], default="trisurf",
+                        help="tracé de la solution (none pour un lancement sans affichage)")
+    parser.add_argument("--plot-file", help="enregistre le tracé dans ce fichier au lieu de l'afficher")
+    parser.add_argument("--report", help="fichier json où écrire les mesures de chaque étape")
+    parser.add_argument("--quiet", action="store_true", help="n'écrit pas les mesures dans le journal")
+    parser.add_argument("--no-instrumentation", action="store_true", help="désactive les mesures par étape")
+    parser.add_argument("--track-allocations", action="store_true",
+                        help="mesure aussi les allocations de chaque étape avec tracemalloc (plus lent)")
+    parser.add_argument("--profile-stage", help="étape à profiler avec cProfile, par exemple solve")
+    parser.add_argument("--profile-file",
+                        help="fichier où enregistrer le profil (pstats), sinon un résumé est ajouté aux mesures")
+    args = parser.parse_args(argv)
+
+    # Les mesures de chaque étape (temps, mémoire, tailles) sont écrites dans le journal au format json
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format="%(message)s")
+    instrumentation = Instrumentation(enabled=not args.no_instrumentation, track_allocations=args.track_allocations,
+                                      profile_stage=args.profile_stage, profile_path=args.profile_file)
+
+    # Étapes de la résolution : lecture du maillage (gardé compilé dans le cache pour les lancements suivants),
+    # assemblage vectorisé de la matrice de rigidité et du second membre, condition de Dirichlet sur le bord,
+    # résolution puis index spatial pour évaluer la solution en tout point
+    pipeline = Pipeline(args.mesh, load_source(args.source), backend=args.backend, cache_dir=args.cache_dir or None,
+                        method=args.method, preconditioner=None if args.preconditioner == "none" else args.preconditioner,
+                        order=args.order, dirichlet_tag=args.dirichlet_tag, g=args.g, renumber=args.renumber,
+                        workers=args.workers, instrumentation=instrumentation)
+    pipeline.run()
+    write_outputs(pipeline, args)
+    if args.report:
+        instrumentation.write_json(args.report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,62 @@
-import gmsh
-from typing import List
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Sequence
+from functools import partial
+from typing import Callable
 
+import numpy as np
+from scipy.sparse import csr_matrix, identity
+
+import assembly
+import msh_reader
+from geometry import Geometry
 from point import Point
 from segment import Segment
+from topology import Topology
 from triangle import Triangle
 
 
+class ElementViews(Sequence):
+    """
+    Séquence paresseuse des points, segments ou triangles d'un maillage : les objets ne sont créés qu'au moment où on
+    y accède, sous la forme de vues sur les tableaux du maillage, ce qui évite de garder en mémoire un objet Python
+    par élément.
+    """
+    __slots__ = ("_factory", "_n")
+
+    def __init__(self, factory: Callable[[int], object], n: int):
+        """
+        :param factory: fonction qui construit la vue de l'élément d'indice i
+        :param n: le nombre d'éléments
+        """
+        self._factory = factory
+        self._n = n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._factory(k) for k in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return self._factory(i)
+
+    def __iter__(self):
+        return map(self._factory, range(self._n))
+
+
 class Mesh:
+    # tableaux enregistrés dans le cache binaire du maillage (voir save et load)
+    CACHED_ARRAYS : tuple = ("coords", "triangle_nodes", "segment_nodes", "triangle_tags", "segment_tags")
+    # à incrémenter si le contenu du cache change, les anciens caches sont alors ignorés
+    CACHE_VERSION : int = 2
+
     def __init__(self):
         """
         La classe Mesh est la représentation d'un maillage triangulaire de gmsh en liste de Point, Segment, Triangle,
@@ -14,84 +64,375 @@ class Mesh:
         Pour implémenter la méthode des éléments finis dans d'autres dimensions, il suffirait de créer une interface
         et de considérer les interfaces plutôt que les classes Point, Segment, Triangle.
         Le constructeur ne prend volontairement aucun paramètre afin de pouvoir remplir la mesh avec une fonction.
+        Les données sont stockées dans des tableaux numpy contigus, les listes points, segments et triangles n'en sont
+        que des vues, ce qui permet aux calculs numériques de travailler directement sur les tableaux.
         """
-        self.points : list = [] # représente tous les points du maillage
-        self.segments : list = [] # représente tous les segments du maillage
-        self.triangles : list = [] # représente tous les triangles du maillage
-        self.Npts : int = 0 # représente le nombre de points dans le maillage
-        self.Nseg : int = 0 # représente le nombre de segments dans le maillage
-        self.Ntri : int = 0 # représente le nombre de triangles du maillage
+        self._geometry : Geometry = None # géométrie des triangles, calculée à la première demande
+        self._topology : Topology = None # adjacences, calculées à la première demande ou relues dans le cache
+        self.coords : np.ndarray = np.empty((0, 2)) # coordonnées (Npts, 2) des points, la ligne i est le point d'id i
+        self.segment_nodes : np.ndarray = np.empty((0, 2), dtype=np.int32) # sommets (Nseg, 2) de chaque segment
+        self.triangle_nodes : np.ndarray = np.empty((0, 3), dtype=np.int32) # sommets (Ntri, 3) de chaque triangle
+        self.segment_tags : np.ndarray = np.empty(0, dtype=np.int32) # tag physique de chaque segment
+        self.triangle_tags : np.ndarray = np.empty(0, dtype=np.int32) # tag physique de chaque triangle
+        self.physical_names : dict = {} # (dimension, tag physique) -> nom du groupe physique, s'il est connu
+        self.permutation : np.ndarray = None # après renumber, le point i est le point permutation[i] du fichier
+
+    def set_arrays(self, coords: np.ndarray, triangle_nodes: np.ndarray, segment_nodes: np.ndarray = None,
+                   triangle_tags: np.ndarray = None, segment_tags: np.ndarray = None) -> None:
+        """
+        Remplit le maillage à partir de ses tableaux, les tags absents valent -1 comme pour les objets sans groupe
+        physique
+        :param coords: coordonnées (Npts, 2) des points (les colonnes supplémentaires, comme z, sont ignorées)
+        :param triangle_nodes: indices (Ntri, 3) des sommets de chaque triangle, comptés à partir de 0
+        :param segment_nodes: indices (Nseg, 2) des extrémités de chaque segment
+        :param triangle_tags: tag physique de chaque triangle
+        :param segment_tags: tag physique de chaque segment
+        :return: None
+        """
+        if segment_nodes is None:
+            segment_nodes = np.empty((0, 2))
+        self.coords = np.ascontiguousarray(np.asarray(coords, dtype=float)[:, :2])
+        self.triangle_nodes = np.ascontiguousarray(triangle_nodes, dtype=np.int32).reshape(-1, 3)
+        self.segment_nodes = np.ascontiguousarray(segment_nodes, dtype=np.int32).reshape(-1, 2)
+        self.triangle_tags = (np.full(self.Ntri, -1, dtype=np.int32) if triangle_tags is None
+                              else np.ascontiguousarray(triangle_tags, dtype=np.int32))
+        self.segment_tags = (np.full(self.Nseg, -1, dtype=np.int32) if segment_tags is None
+                             else np.ascontiguousarray(segment_tags, dtype=np.int32))
+        self.permutation = None
+
+    @property
+    def coords(self) -> np.ndarray:
+        return self._coords
+
+    @coords.setter
+    def coords(self, coords: np.ndarray) -> None:
+        self._coords = coords
+        self.invalidate_geometry()
+
+    @property
+    def triangle_nodes(self) -> np.ndarray:
+        return self._triangle_nodes
+
+    @triangle_nodes.setter
+    def triangle_nodes(self, triangle_nodes: np.ndarray) -> None:
+        self._triangle_nodes = triangle_nodes
+        self.invalidate_geometry()
+        self._topology = None
+
+    @property
+    def segment_nodes(self) -> np.ndarray:
+        return self._segment_nodes
+
+    @segment_nodes.setter
+    def segment_nodes(self, segment_nodes: np.ndarray) -> None:
+        self._segment_nodes = segment_nodes
+        self._topology = None
+
+    @property
+    def segment_tags(self) -> np.ndarray:
+        return self._segment_tags
+
+    @segment_tags.setter
+    def segment_tags(self, segment_tags: np.ndarray) -> None:
+        self._segment_tags = segment_tags
+        self._topology = None
+
+    @property
+    def geometry(self) -> Geometry:
+        """
+        Géométrie de tous les triangles (déterminants, aires, Bp, gradients des fonctions de forme), calculée une seule
+        fois puis gardée en mémoire. Elle est recalculée automatiquement si coords ou triangle_nodes sont remplacés ;
+        si les coordonnées sont modifiées sur place (par exemple via Point.x), il faut appeler invalidate_geometry.
+        :return: Geometry
+        """
+        if self._geometry is None:
+            self._geometry = Geometry(self.coords, self.triangle_nodes)
+        return self._geometry
+
+    @property
+    def topology(self) -> Topology:
+        """
+        Adjacences du maillage (point -> triangles, point -> points, arêtes et leurs triangles, points du bord par tag
+        physique), calculées une seule fois puis gardées en mémoire. Elles sont enregistrées dans le cache binaire avec
+        le maillage et recalculées si triangle_nodes, segment_nodes ou segment_tags sont remplacés.
+        :return: Topology
+        """
+        if self._topology is None:
+            self._topology = Topology(self.Npts, self.triangle_nodes, self.segment_nodes, self.segment_tags)
+        return self._topology
+
+    def invalidate_geometry(self) -> None:
+        """
+        Oublie la géométrie en cache, elle sera recalculée au prochain accès
+        :return: None
+        """
+        self._geometry = None
+
+    @property
+    def Npts(self) -> int:
+        return len(self.coords) # représente le nombre de points dans le maillage
+
+    @property
+    def Nseg(self) -> int:
+        return len(self.segment_nodes) # représente le nombre de segments dans le maillage
+
+    @property
+    def Ntri(self) -> int:
+        return len(self.triangle_nodes) # représente le nombre de triangles du maillage
+
+    @property
+    def points(self) -> ElementViews:
+        """
+        Tous les points du maillage, sous forme de vues sur self.coords
+        :return: ElementViews de Point
+        """
+        return ElementViews(partial(Point.view, self), self.Npts)
+
+    @property
+    def segments(self) -> ElementViews:
+        """
+        Tous les segments du maillage, sous forme de vues sur self.segment_nodes
+        :return: ElementViews de Segment
+        """
+        return ElementViews(partial(Segment.view, self), self.Nseg)
+
+    @property
+    def triangles(self) -> ElementViews:
+        """
+        Tous les triangles du maillage, sous forme de vues sur self.triangle_nodes
+        :return: ElementViews de Triangle
+        """
+        return ElementViews(partial(Triangle.view, self), self.Ntri)
+
+    def node_graph(self) -> csr_matrix:
+        """
+        Graphe des points : deux points sont voisins s'ils appartiennent à un même triangle, c'est la structure creuse
+        de la matrice de rigidité. Il est lu directement dans les adjacences point -> points de la topologie.
+        :return: matrice CSR (Npts, Npts) symétrique, diagonale comprise
+        """
+        topology = self.topology
+        graph = csr_matrix((np.ones(len(topology.node_neighbors), dtype=np.int8), topology.node_neighbors,
+                            topology.node_neighbors_indptr), shape=(self.Npts, self.Npts))
+        return (graph + identity(self.Npts, dtype=np.int8, format="csr")).tocsr()
+
+    def bandwidth(self) -> tuple[int, int]:
+        """
+        Largeur de bande et profil de la matrice de rigidité pour la numérotation actuelle des points
+        :return: (largeur de bande max |i - j|, profil somme sur les lignes de i - min j)
+        """
+        graph = self.node_graph().tocoo()
+        first = np.full(self.Npts, np.iinfo(np.int64).max)
+        np.minimum.at(first, graph.row, graph.col)
+        return int(np.abs(graph.row - graph.col).max(initial=0)), int((np.arange(self.Npts) - first).sum())
+
+    def renumber(self, method:str="rcm", report_fill:bool=False, permc_spec:str="COLAMD") -> dict:
+        """
+        Renumérote les points pour réduire la largeur de bande de la matrice (Reverse Cuthill-McKee), ce qui améliore
+        la localité de l'assemblage, du produit matrice-vecteur et des préconditionneurs qui suivent la numérotation
+        (ILU). Le solveur direct ne profite pas de RCM : splu calcule son propre ordre des colonnes (COLAMD par
+        défaut), le remplissage des facteurs LU reste donc à peu près le même. Les coordonnées, les triangles et les
+        segments sont permutés de façon cohérente ; restore_order ramène ensuite une solution dans la numérotation
+        d'origine.
+        :param method: "rcm" (scipy.sparse.csgraph.reverse_cuthill_mckee)
+        :param report_fill: mesure aussi le nombre de coefficients des facteurs LU de la matrice de rigidité avant et
+        après (coûte deux factorisations)
+        :param permc_spec: ordre des colonnes de splu utilisé pour mesurer le remplissage, le même que celui du
+        solveur (voir solvers.Solver)
+        :return: les largeurs de bande, profils (et remplissages) avant et après
+        """
+        if method != "rcm":
+            raise ValueError(f"méthode de renumérotation inconnue : {method}")
+        from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+        report = dict(zip(("bandwidth_before", "profile_before"), self.bandwidth()))
+        if report_fill:
+            report["fill_before"] = self._factor_fill(permc_spec)
+        order = reverse_cuthill_mckee(self.node_graph(), symmetric_mode=True).astype(np.int64)
+        new_index = np.empty(self.Npts, dtype=np.int32)
+        new_index[order] = np.arange(self.Npts, dtype=np.int32) # new_index[ancien] = nouveau
+        self.coords = np.ascontiguousarray(self.coords[order])
+        self.triangle_nodes = new_index[self.triangle_nodes]
+        self.segment_nodes = new_index[self.segment_nodes]
+        self.permutation = order if self.permutation is None else self.permutation[order]
+        report.update(zip(("bandwidth_after", "profile_after"), self.bandwidth()))
+        if report_fill:
+            report["fill_after"] = self._factor_fill(permc_spec)
+        return report
+
+    def _factor_fill(self, permc_spec:str) -> int:
+        from scipy.sparse.linalg import splu
+
+        A = assembly.assemble(self, stiffness=1, mass=1).tocsr() # la masse rend la matrice inversible
+        lu = splu(A.tocsc(), permc_spec=permc_spec)
+        return int(lu.L.nnz + lu.U.nnz)
+
+    def restore_order(self, values:np.ndarray) -> np.ndarray:
+        """
+        Remet des valeurs aux points (par exemple la solution) dans la numérotation d'origine du fichier
+        :param values: tableau (Npts,) ou (Npts, k) dans la numérotation actuelle
+        :return: tableau de même forme dans la numérotation d'origine
+        """
+        if self.permutation is None:
+            return values
+        restored = np.empty_like(values)
+        restored[self.permutation] = values
+        return restored
 
     @staticmethod
     def get_physical_tag(dim :int, tag : int) -> int:
         """
-        Cette méthode permet de savoir si un élément de dimension dim du maillage gmsh possède un tag physical
-        :param dim: la dimension de l'élément considéré
-        :param tag: le tag de l'élément considéré
+        Cette méthode permet de savoir si une entité de dimension dim du maillage gmsh possède un tag physical.
+        Tous les éléments d'une même entité partagent le même groupe physique, il suffit donc d'un appel par entité
+        et non par élément.
+        :param dim: la dimension de l'entité considérée
+        :param tag: le tag de l'entité considérée
         :return: le physical tag ou bien -1 si l'objet n'en a pas
         """
-        for phys_dim, phys_tag in gmsh.model.getPhysicalGroups(): # on parcourt tous les groupes physiques
-            # on récupère tous les tags des éléments de ce groupe
-            entities = gmsh.model.getEntitiesForPhysicalGroup(phys_dim, phys_tag)
+        import gmsh # importé ici pour que seul le chargement via gmsh nécessite la bibliothèque
+        phys_tags = gmsh.model.getPhysicalGroupsForEntity(dim, tag)
+        return int(phys_tags[0]) if len(phys_tags) > 0 else -1
 
-            # Vérifie si la dimension correspond et si notre tag est dans les tags du groupe
-            if dim == phys_dim and tag in entities:
-                return phys_tag
-        return -1
+    @staticmethod
+    def get_elements(dim: int, element_type: int, index: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Récupère en bloc tous les éléments d'un type donné (1 pour les segments, 2 pour les triangles) ainsi que leur
+        tag physique, en ne faisant qu'un appel à gmsh par entité géométrique
+        :param dim: la dimension des éléments
+        :param element_type: le type gmsh des éléments
+        :param index: tableau qui donne la ligne d'un point à partir de son tag gmsh
+        :return: (nodes, tags) avec nodes de forme (N, nombre de sommets) et tags de forme (N,)
+        """
+        import gmsh
+        nodes_per_element = gmsh.model.mesh.getElementProperties(element_type)[3]
+        blocks, tags = [], []
+        for _, entity in gmsh.model.getEntities(dim):
+            element_tags, node_tags = gmsh.model.mesh.getElementsByType(element_type, entity)
+            if len(element_tags) == 0:
+                continue
+            # les sommets sont renvoyés à plat [n1, n2, n3, n1, n2, n3...], l'index les transforme en lignes de points
+            blocks.append(index[np.asarray(node_tags, dtype=np.int64)].reshape(-1, nodes_per_element))
+            tags.append(np.full(len(element_tags), Mesh.get_physical_tag(dim, entity), dtype=np.int32))
+        if not blocks:
+            return np.empty((0, nodes_per_element), dtype=np.int32), np.empty(0, dtype=np.int32)
+        return np.concatenate(blocks), np.concatenate(tags)
 
-    def GmshToMesh(self, filename:str) -> None:
+    def GmshToMesh(self, filename:str, backend:str="gmsh", cache_dir:str=None) -> None:
         """
         Cette fonction a pour but de lire un fichier msh (c'est à dire un maillage de gmsh) pour le convertir en notre
-        structure de données evoquée plus haut
+        structure de données evoquée plus haut. Toutes les données sont lues en bloc sous forme de tableaux, ce qui
+        évite un appel à l'API gmsh par point ou par élément.
         :param filename: le nom du fichier .msh
+        :param backend: "gmsh" pour lire le fichier avec l'API gmsh, "native" pour utiliser le lecteur msh_reader qui
+        ne dépend pas de gmsh (format 4.1 uniquement, ASCII ou binaire)
+        :param cache_dir: si ce dossier est donné, le maillage compilé y est enregistré au premier chargement puis
+        relu directement (en mémoire partagée via np.memmap) tant que le contenu du fichier .msh ne change pas
         :return: Ne retourne rien mais remplit les informations de l'objet sur lequel il est appelé
         """
+        if cache_dir is not None:
+            entry = os.path.join(cache_dir, Mesh.cache_key(filename))
+            if os.path.isdir(entry):
+                self.load(entry)
+                return
+            self.GmshToMesh(filename, backend)
+            self.save(entry)
+            # nom et empreinte du chemin, communs à toutes les versions de ce fichier
+            stem = os.path.basename(entry).rsplit("-", 1)[0]
+            for old in os.listdir(cache_dir): # on supprime les caches périmés du même fichier
+                if old != os.path.basename(entry) and old.rsplit("-", 1)[0] == stem:
+                    shutil.rmtree(os.path.join(cache_dir, old), ignore_errors=True)
+            return
+        if backend == "native":
+            self.MshToMesh(filename)
+            return
+        if backend != "gmsh":
+            raise ValueError(f"backend inconnu : {backend}")
+        import gmsh
         gmsh.initialize() # lance l'API gmsh
         gmsh.open(filename) # charge en mémoire le fichier demandé
-        nodes = gmsh.model.mesh.getNodes() # récupère tous les points du maillage sous la forme (list, list, list)
-        # la première liste contient les tags des points
-        # la deuxième leurs coordonnées sous la forme [x1,y1,x2,y2...]
-        # la troisième, qui ne nous intéresse pas, donne les coordonnées paramétriques.
-        points = [0 for _ in range(len(nodes[0])+1)] # on initialise la liste de points afin de pouvoir les ranger en suivant l'ordre de gmsh
-        for i in range(len(nodes[0])):
-            p = Point(gmsh.model.mesh.getNode(nodes[0][i])[0][0], gmsh.model.mesh.getNode(nodes[0][i])[0][1], i)
-            index = nodes[0][i]
-            points[int(index)] = p
-
-        d1element_infos = gmsh.model.mesh.getElements(dim=1) # on récupère tous les éléments de dimension 1 du maillage sous la forme (lit, list, list)
-        #Nous ne nous intéresserons qu'à la deuxième (la première n'étant que le type d'élément considéré), qui contient le tag de chaque élément
-        elements_tags = d1element_infos[1][0]
-        segments = [0 for _ in range(len(elements_tags) + 1)]
-        i = 0
-        for tag in elements_tags: #on parcourt tous les tags
-            segment_boundaries = gmsh.model.mesh.getElement(tag)[1] #la fonction getElement renvoie son type, puis les tags des sommets, on stock donc les tags des sommets
-            phys_tag = Mesh.get_physical_tag(1, tag) #on récupère le tag physique pour savoir si le segment est sur le bord ou non
-            segment = Segment([points[segment_boundaries[0]], points[segment_boundaries[1]]], i, phys_tag) # notre façon de stocker les points permet que l'index dans la liste soit le tag du point
-            segments[int(tag)] = segment
-            i+= 1
-
-        #on fait de même pour les triangles
-        d2element_infos = gmsh.model.mesh.getElements(dim=2)
-        elements_tags = d2element_infos[1][0]
-        triangles = []
-        i = 0
-        for tag in elements_tags:
-            triangle_boundaries_tags = gmsh.model.mesh.getElement(tag)[1]
-            phys_tag = Mesh.get_physical_tag(2, tag)
-            triangle = Triangle([points[triangle_boundaries_tags[0]], points[triangle_boundaries_tags[1]],
-                                 points[triangle_boundaries_tags[2]]], i, phys_tag)
-            triangles.append(triangle)
-            i += 1
+        node_tags, node_coords, _ = gmsh.model.mesh.getNodes() # récupère tous les points du maillage
+        # node_tags contient les tags des points, node_coords leurs coordonnées sous la forme [x1,y1,z1,x2,y2,z2...]
+        # le troisième tableau, qui ne nous intéresse pas, donne les coordonnées paramétriques.
+        node_tags = np.asarray(node_tags, dtype=np.int64)
+        coords = np.asarray(node_coords, dtype=float).reshape(-1, 3)[:, :2]
+        index = np.full(node_tags.max() + 1, -1, dtype=np.int32) # index[tag] donne la ligne du point de tag gmsh tag
+        index[node_tags] = np.arange(len(node_tags), dtype=np.int32)
+
+        segment_nodes, segment_tags = Mesh.get_elements(1, 1, index) # les segments à deux sommets sont de type 1
+        triangle_nodes, triangle_tags = Mesh.get_elements(2, 2, index) # les triangles à trois sommets sont de type 2
+
+        physical_names = {(dim, tag): gmsh.model.getPhysicalName(dim, tag)
+                          for dim, tag in gmsh.model.getPhysicalGroups()}
 
         gmsh.finalize() #on ferme l'api gmsh
-        # on remplit les différents attributs
-        self.points = points[1:]  # on ne récupère pas le premier élément car il n'est pas un point, en effet tous les tags commencent à 1 donc on ne peut avoir d'élément en position 0
-        self.segments = segments[1:]
-        self.triangles = triangles
-        self.Npts = len(self.points)
-        self.Nseg = len(self.segments)
-        self.Ntri = len(self.triangles)
+        # on remplit les différents tableaux, les points, segments et triangles en sont des vues
+        self.set_arrays(coords, triangle_nodes, segment_nodes, triangle_tags, segment_tags)
+        self.physical_names = {key: name for key, name in physical_names.items() if name}
 
+    def MshToMesh(self, filename:str) -> None:
+        """
+        Remplit le maillage à partir d'un fichier .msh 4.1 lu par msh_reader, sans démarrer gmsh
+        :param filename: le nom du fichier .msh
+        :return: None
+        """
+        reader = msh_reader.read_msh(filename)
+        self.set_arrays(reader.coords, reader.triangles.array(), reader.segments.array(),
+                        reader.triangle_tags.array()[:, 0], reader.segment_tags.array()[:, 0])
+        self.physical_names = reader.physical_names
 
+    @staticmethod
+    def cache_key(filename:str) -> str:
+        """
+        Calcule la clé du cache d'un fichier .msh : "nom-chemin-contenu", où chemin est une empreinte du chemin absolu
+        du fichier et contenu une empreinte de son contenu. Le cache est donc automatiquement invalidé dès que le
+        fichier change, et deux fichiers de même nom dans des dossiers différents ont des entrées distinctes.
+        :param filename: le nom du fichier .msh
+        :return: str
+        """
+        digest = hashlib.sha256(str(Mesh.CACHE_VERSION).encode())
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(1 << 23), b""): # lecture par blocs de 8 Mo
+                digest.update(block)
+        source = hashlib.sha256(os.path.abspath(filename).encode()).hexdigest()[:16]
+        return f"{os.path.splitext(os.path.basename(filename))[0]}-{source}-{digest.hexdigest()[:32]}"
 
+    def save(self, directory:str) -> None:
+        """
+        Enregistre le maillage sous forme binaire : un fichier .npy par tableau de CACHED_ARRAYS et de la topologie
+        (Topology.ARRAYS) et un fichier json pour les noms physiques. L'écriture se fait dans un dossier temporaire renommé à la fin, un autre processus
+        ne peut donc jamais lire un cache à moitié écrit.
+        :param directory: le dossier du cache
+        :return: None
+        """
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent)
+        try:
+            for name in Mesh.CACHED_ARRAYS:
+                np.save(os.path.join(tmp, name + ".npy"), getattr(self, name))
+            for name in Topology.ARRAYS:
+                np.save(os.path.join(tmp, name + ".npy"), getattr(self.topology, name))
+            with open(os.path.join(tmp, "physical_names.json"), "w") as f:
+                json.dump([[dim, tag, name] for (dim, tag), name in self.physical_names.items()], f)
+            os.replace(tmp, directory)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(directory): # un autre processus a pu écrire le même cache en même temps
+                raise
 
+    def load(self, directory:str, mmap:bool=True) -> None:
+        """
+        Relit un maillage enregistré avec save. Par défaut les tableaux sont projetés en mémoire (np.memmap en
+        lecture seule) : le chargement ne copie rien et plusieurs processus partagent les mêmes pages. La topologie est
+        relue elle aussi, elle n'est donc pas recalculée.
+        :param directory: le dossier du cache
+        :param mmap: False pour charger une copie modifiable des tableaux
+        :return: None
+        """
+        mode = "r" if mmap else None
+        for name in Mesh.CACHED_ARRAYS:
+            setattr(self, name, np.load(os.path.join(directory, name + ".npy"), mmap_mode=mode))
+        self._topology = Topology.from_arrays({name: np.load(os.path.join(directory, name + ".npy"), mmap_mode=mode)
+                                               for name in Topology.ARRAYS})
+        with open(os.path.join(directory, "physical_names.json")) as f:
+            self.physical_names = {(dim, tag): name for dim, tag, name in json.load(f)}
+        self.permutation = None # le cache est dans la numérotation du fichier
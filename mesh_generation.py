@@ -0,0 +1,88 @@
+import numpy as np
+
+from mesh import Mesh
+
+
+def structured_square(n: int, boundary_tag: int = 0, domain_tag: int = 10) -> Mesh:
+    """
+    Maillage régulier du carré unité : n x n carrés coupés chacun en deux triangles orientés dans le sens
+    trigonométrique
+    :param n: nombre de subdivisions par côté
+    :param boundary_tag: tag physique des segments du bord (0 comme dans square.msh)
+    :param domain_tag: tag physique des triangles
+    :return: Mesh avec (n + 1)^2 points et 2 n^2 triangles
+    """
+    x, y = np.meshgrid(np.linspace(0, 1, n + 1), np.linspace(0, 1, n + 1), indexing="ij")
+    coords = np.column_stack((x.ravel(), y.ravel()))
+    index = np.arange((n + 1) ** 2).reshape(n + 1, n + 1) # index[i, j] est le point (i / n, j / n)
+    a, b, c, d = index[:-1, :-1].ravel(), index[1:, :-1].ravel(), index[1:, 1:].ravel(), index[:-1, 1:].ravel()
+    triangles = np.concatenate((np.column_stack((a, b, c)), np.column_stack((a, c, d))))
+    # le bord est parcouru dans le sens trigonométrique : bas, droite, haut puis gauche
+    loop = np.concatenate((index[:, 0], index[-1, 1:], index[-2::-1, -1], index[0, -2:0:-1]))
+    segments = np.column_stack((loop, np.roll(loop, -1)))
+    mesh = Mesh()
+    mesh.set_arrays(coords, triangles, segments, np.full(len(triangles), domain_tag), np.full(len(segments), boundary_tag))
+    return mesh
+
+
+def unstructured_square(n: int, seed: int = 0, boundary_tag: int = 0, domain_tag: int = 10) -> Mesh:
+    """
+    Maillage non structuré du carré unité : triangulation de Delaunay de n points par côté sur le bord et de
+    (n - 1)^2 points tirés au hasard à l'intérieur. La graine rend le maillage reproductible.
+    :param n: nombre de subdivisions par côté, le maillage a à peu près autant de points que structured_square(n)
+    :param seed: graine du générateur aléatoire
+    :param boundary_tag: tag physique des segments du bord
+    :param domain_tag: tag physique des triangles
+    :return: Mesh
+    """
+    from scipy.spatial import Delaunay
+
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 1, n + 1)[:-1]
+    boundary = np.concatenate((np.column_stack((t, 0 * t)), np.column_stack((1 + 0 * t, t)),
+                               np.column_stack((1 - t, 1 + 0 * t)), np.column_stack((0 * t, 1 - t))))
+    interior = rng.uniform(0.5 / n, 1 - 0.5 / n, size=((n - 1) ** 2, 2))
+    coords = np.concatenate((boundary, interior))
+    triangles = Delaunay(coords).simplices
+    p = coords[triangles]
+    det = (p[:, 1, 0] - p[:, 0, 0]) * (p[:, 2, 1] - p[:, 0, 1]) - (p[:, 2, 0] - p[:, 0, 0]) * (p[:, 1, 1] - p[:, 0, 1])
+    triangles = triangles[np.abs(det) > 1e-14] # on écarte d'éventuels triangles plats le long du bord
+    det = det[np.abs(det) > 1e-14]
+    triangles[det < 0] = triangles[det < 0][:, [0, 2, 1]] # orientation dans le sens trigonométrique
+    nb = len(boundary)
+    segments = np.column_stack((np.arange(nb), (np.arange(nb) + 1) % nb))
+    mesh = Mesh()
+    mesh.set_arrays(coords, triangles, segments, np.full(len(triangles), domain_tag), np.full(nb, boundary_tag))
+    return mesh
+
+
+def refine_uniformly(mesh: Mesh) -> tuple[Mesh, np.ndarray]:
+    """
+    Raffinement uniforme : chaque triangle est coupé en quatre par les milieux de ses arêtes et chaque segment en
+    deux. Les points du maillage grossier gardent leur numéro, les milieux sont ajoutés après eux. Chaque segment doit
+    être le côté d'un triangle, sinon une ValueError est levée.
+    :param mesh: le maillage grossier, qui n'est pas modifié
+    :return: (fine, parents) où parents (Nmilieux, 2) donne les extrémités de l'arête dont chaque nouveau point est
+    le milieu
+    """
+    n = mesh.Npts
+    topology = mesh.topology
+    nodes = mesh.triangle_nodes.astype(np.int64)
+    a, b, c = nodes[:, 0], nodes[:, 1], nodes[:, 2]
+    middle = topology.triangle_edges.astype(np.int64) + n # numéro du milieu de chaque arête
+    bc, ca, ab = middle[:, 0], middle[:, 1], middle[:, 2] # l'arête k est opposée au sommet k
+    parents = topology.edges
+    coords = np.concatenate((mesh.coords, mesh.coords[parents].mean(axis=1)))
+    # les quatre enfants gardent l'orientation du parent
+    triangles = np.concatenate((np.column_stack((a, ab, ca)), np.column_stack((ab, b, bc)),
+                                np.column_stack((ca, bc, c)), np.column_stack((ab, bc, ca))))
+    if np.any(topology.segment_edges < 0):
+        orphan = mesh.segment_nodes[np.argmax(topology.segment_edges < 0)]
+        raise ValueError(f"le segment {tuple(orphan.tolist())} n'est le côté d'aucun triangle, il ne peut pas être coupé")
+    s, t = mesh.segment_nodes[:, 0], mesh.segment_nodes[:, 1]
+    middle = topology.segment_edges.astype(np.int64) + n
+    segments = np.concatenate((np.column_stack((s, middle)), np.column_stack((middle, t))))
+    fine = Mesh()
+    fine.set_arrays(coords, triangles, segments, np.tile(mesh.triangle_tags, 4), np.tile(mesh.segment_tags, 2))
+    fine.physical_names = dict(mesh.physical_names)
+    return fine, parents
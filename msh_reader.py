@@ -0,0 +1,221 @@
+import numpy as np
+
+# Nombre de lignes (ou d'éléments en binaire) lues d'un coup, ce qui borne la mémoire temporaire utilisée par la
+# lecture quelle que soit la taille du fichier
+CHUNK_ROWS = 1 << 16
+
+# Nombre de sommets des types d'éléments gmsh les plus courants, nécessaire pour sauter les blocs binaires des types
+# que l'on ne garde pas (seuls les segments, de type 1, et les triangles, de type 2, nous intéressent)
+NODES_PER_ELEMENT = {1: 2, 2: 3, 3: 4, 4: 4, 5: 8, 6: 6, 7: 5, 8: 3, 9: 6, 10: 9, 11: 10, 12: 27, 13: 18, 14: 14,
+                     15: 1, 16: 8, 17: 20, 18: 15, 19: 13, 20: 9, 21: 10, 22: 12, 23: 15, 24: 15, 25: 21, 26: 4,
+                     27: 5, 28: 6, 29: 20, 30: 35, 31: 56}
+
+
+class GrowableArray:
+    """
+    Tableau 2d que l'on remplit par blocs sans connaître sa taille finale, la capacité double quand elle est
+    atteinte ce qui donne un coût amorti constant par ligne.
+    """
+    __slots__ = ("data", "size")
+
+    def __init__(self, ncols: int, dtype, capacity: int = 1024):
+        self.data = np.empty((capacity, ncols), dtype=dtype)
+        self.size = 0
+
+    def extend(self, block: np.ndarray) -> None:
+        """
+        Ajoute un bloc de lignes à la fin du tableau
+        :param block: tableau (k, ncols)
+        :return: None
+        """
+        needed = self.size + len(block)
+        if needed > len(self.data):
+            grown = np.empty((max(needed, 2 * len(self.data)), self.data.shape[1]), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:needed] = block
+        self.size = needed
+
+    def array(self) -> np.ndarray:
+        """
+        :return: les lignes effectivement remplies (vue, sans copie)
+        """
+        return self.data[:self.size]
+
+
+class MshReader:
+    def __init__(self, filename: str):
+        """
+        Lecteur autonome des fichiers .msh au format 4.1 (ASCII ou binaire) qui ne dépend pas de gmsh.
+        Le fichier est lu section par section et chaque bloc de points ou d'éléments est découpé en morceaux de
+        CHUNK_ROWS lignes directement convertis en tableaux numpy, la mémoire utilisée reste donc proportionnelle
+        au maillage et non à la taille du texte.
+        :param filename: le nom du fichier .msh
+        """
+        self.filename : str = filename
+        self.binary : bool = False # le format est lu dans l'en-tête $MeshFormat
+        self.size_t = np.dtype("<u8") # taille des entiers non signés du format binaire (data-size de l'en-tête)
+        self.int = np.dtype("<i4")
+        self.double = np.dtype("<f8")
+        self.physical_names : dict = {} # (dimension, tag physique) -> nom du groupe
+        self.entity_tags : dict = {} # (dimension, tag de l'entité) -> tag physique de l'entité ou -1
+        self.coords = np.empty((0, 2))
+        self.index = np.empty(0, dtype=np.int32) # index[tag] donne la ligne du point de tag gmsh tag
+        self.segments = GrowableArray(2, np.int32)
+        self.segment_tags = GrowableArray(1, np.int32)
+        self.triangles = GrowableArray(3, np.int32)
+        self.triangle_tags = GrowableArray(1, np.int32)
+
+    def read(self) -> "MshReader":
+        """
+        Lit tout le fichier, les sections inconnues (ou inutiles, comme $NodeData) sont ignorées
+        :return: le lecteur lui-même, dont les attributs sont remplis
+        """
+        with open(self.filename, "rb") as f:
+            for line in iter(f.readline, b""):
+                section = line.strip()
+                if section == b"$MeshFormat":
+                    self._read_format(f)
+                elif section == b"$PhysicalNames":
+                    self._read_physical_names(f)
+                elif section == b"$Entities":
+                    self._read_entities(f)
+                elif section == b"$Nodes":
+                    self._read_nodes(f)
+                elif section == b"$Elements":
+                    self._read_elements(f)
+                elif section.startswith(b"$") and not section.startswith(b"$End"):
+                    self._skip_section(f, section)
+        return self
+
+    # ---- utilitaires de lecture ----
+
+    def _read_binary(self, f, dtype: np.dtype, count: int) -> np.ndarray:
+        data = f.read(dtype.itemsize * count)
+        if len(data) != dtype.itemsize * count:
+            raise ValueError(f"{self.filename} : fin de fichier inattendue")
+        return np.frombuffer(data, dtype=dtype, count=count)
+
+    def _read_ints(self, f, count: int) -> np.ndarray:
+        """
+        Lit count entiers de l'en-tête d'une section (size_t en binaire)
+        """
+        if self.binary:
+            return self._read_binary(f, self.size_t, count).astype(np.int64)
+        values = np.array(f.readline().split()[:count], dtype=np.int64)
+        return values
+
+    def _read_rows(self, f, nrows: int, ncols: int, dtype):
+        """
+        Générateur qui lit nrows lignes de ncols valeurs par morceaux d'au plus CHUNK_ROWS lignes
+        :return: des tableaux (k, ncols)
+        """
+        dtype = np.dtype(dtype)
+        done = 0
+        while done < nrows:
+            k = min(CHUNK_ROWS, nrows - done)
+            if self.binary:
+                yield self._read_binary(f, dtype, k * ncols).reshape(k, ncols)
+            else:
+                text = b" ".join(f.readline() for _ in range(k)).decode()
+                yield np.fromstring(text, dtype=float if dtype.kind == "f" else np.int64, sep=" ").reshape(k, ncols)
+            done += k
+
+    def _skip_section(self, f, section: bytes) -> None:
+        end = b"$End" + section[1:]
+        for line in iter(f.readline, b""):
+            if line.strip() == end:
+                return
+
+    # ---- sections ----
+
+    def _read_format(self, f) -> None:
+        version, file_type, data_size = f.readline().split()
+        if version != b"4.1": # le 4.0 a une autre disposition des sections $Entities et $Nodes
+            raise ValueError(f"{self.filename} : seul le format msh 4.1 est pris en charge (version {version.decode()})")
+        self.binary = file_type == b"1"
+        if self.binary:
+            self.size_t = np.dtype(f"<u{int(data_size)}")
+            if int.from_bytes(f.read(4), "little") != 1: # l'entier 1 permet de détecter le boutisme
+                self.size_t, self.int, self.double = (dt.newbyteorder(">") for dt in (self.size_t, self.int, self.double))
+            f.readline()
+
+    def _read_physical_names(self, f) -> None:
+        # cette section est toujours en ASCII, même pour un fichier binaire
+        for _ in range(int(f.readline())):
+            dim, tag, name = f.readline().decode().split(maxsplit=2)
+            self.physical_names[(int(dim), int(tag))] = name.strip().strip('"')
+
+    def _read_entities(self, f) -> None:
+        counts = self._read_ints(f, 4)
+        for dim, count in enumerate(counts):
+            for _ in range(count):
+                if self.binary:
+                    tag = int(self._read_binary(f, self.int, 1)[0])
+                    self._read_binary(f, self.double, 3 if dim == 0 else 6)
+                    nphys = int(self._read_binary(f, self.size_t, 1)[0])
+                    phys = self._read_binary(f, self.int, nphys)
+                    if dim > 0: # les entités de dimension > 0 donnent aussi leurs frontières
+                        self._read_binary(f, self.int, int(self._read_binary(f, self.size_t, 1)[0]))
+                else:
+                    values = f.readline().split()
+                    tag = int(values[0])
+                    offset = 4 if dim == 0 else 7 # on saute les coordonnées (ou la boîte englobante)
+                    phys = values[offset + 1: offset + 1 + int(values[offset])]
+                self.entity_tags[(dim, tag)] = int(phys[0]) if len(phys) > 0 else -1
+
+    def _read_nodes(self, f) -> None:
+        num_blocks, num_nodes, _, max_tag = self._read_ints(f, 4)
+        self.coords = np.empty((num_nodes, 2))
+        self.index = np.full(max_tag + 1, -1, dtype=np.int32)
+        row = 0
+        for _ in range(num_blocks):
+            if self.binary:
+                dim, _, parametric = self._read_binary(f, self.int, 3)
+                n = int(self._read_binary(f, self.size_t, 1)[0])
+            else:
+                dim, _, parametric, n = (int(v) for v in f.readline().split())
+            start = row
+            for tags in self._read_rows(f, n, 1, self.size_t):
+                self.index[tags[:, 0]] = np.arange(row, row + len(tags), dtype=np.int32)
+                row += len(tags)
+            row = start
+            # chaque point donne x, y, z puis éventuellement ses coordonnées paramétriques
+            for xyz in self._read_rows(f, n, 3 + (dim if parametric else 0), self.double):
+                self.coords[row:row + len(xyz)] = xyz[:, :2]
+                row += len(xyz)
+
+    def _read_elements(self, f) -> None:
+        num_blocks = self._read_ints(f, 4)[0]
+        for _ in range(num_blocks):
+            if self.binary:
+                dim, entity, element_type = (int(v) for v in self._read_binary(f, self.int, 3))
+                n = int(self._read_binary(f, self.size_t, 1)[0])
+            else:
+                dim, entity, element_type, n = (int(v) for v in f.readline().split())
+            if element_type == 1:
+                nodes, tags = self.segments, self.segment_tags
+            elif element_type == 2:
+                nodes, tags = self.triangles, self.triangle_tags
+            else:
+                nodes, tags = None, None
+            if nodes is None and not self.binary:
+                for _ in range(n):
+                    f.readline()
+                continue
+            if element_type not in NODES_PER_ELEMENT:
+                raise ValueError(f"{self.filename} : type d'élément {element_type} inconnu")
+            phys = self.entity_tags.get((dim, entity), -1)
+            for rows in self._read_rows(f, n, 1 + NODES_PER_ELEMENT[element_type], self.size_t):
+                if nodes is not None:
+                    nodes.extend(self.index[rows[:, 1:]]) # chaque ligne donne le tag de l'élément puis ses sommets
+                    tags.extend(np.full((len(rows), 1), phys, dtype=np.int32))
+
+
+def read_msh(filename: str) -> MshReader:
+    """
+    Lit un fichier .msh 4.1 sans passer par gmsh
+    :param filename: le nom du fichier
+    :return: le lecteur rempli (coords, triangles, segments, tags et noms physiques)
+    """
+    return MshReader(filename).read()
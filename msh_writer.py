@@ -0,0 +1,79 @@
+import numpy as np
+
+
+def write_msh(mesh, filename: str, node_data: dict = None) -> None:
+    """
+    Écrit le maillage au format .msh 4.1 ASCII, lisible par gmsh et par msh_reader. On crée une entité géométrique
+    par tag physique : une courbe par tag de segment et une surface par tag de triangle.
+    :param mesh: le maillage à écrire
+    :param filename: le nom du fichier
+    :param node_data: champs aux points à ajouter, {nom: tableau (Npts,) ou (Npts, k)}, gmsh les affiche comme des
+    vues (une section $NodeData par champ)
+    :return: None
+    """
+    segment_groups = np.unique(mesh.segment_tags)
+    triangle_groups = np.unique(mesh.triangle_tags)
+    low, high = mesh.coords.min(axis=0), mesh.coords.max(axis=0)
+    box = f"{low[0]} {low[1]} 0 {high[0]} {high[1]} 0"
+    with open(filename, "w") as f:
+        f.write("$MeshFormat\n4.1 0 8\n$EndMeshFormat\n")
+        names = sorted(mesh.physical_names.items())
+        if names:
+            f.write(f"$PhysicalNames\n{len(names)}\n")
+            f.writelines(f'{dim} {tag} "{name}"\n' for (dim, tag), name in names)
+            f.write("$EndPhysicalNames\n")
+        f.write(f"$Entities\n0 {len(segment_groups)} {len(triangle_groups)} 0\n")
+        for entity, tag in enumerate(segment_groups, start=1):
+            f.write(f"{entity} {box} {'1 ' + str(tag) if tag >= 0 else '0'} 0\n")
+        for entity, tag in enumerate(triangle_groups, start=1):
+            f.write(f"{entity} {box} {'1 ' + str(tag) if tag >= 0 else '0'} 0\n")
+        f.write("$EndEntities\n")
+
+        # un seul bloc de points, rattaché à la première surface, de tags 1 à Npts
+        f.write(f"$Nodes\n1 {mesh.Npts} 1 {mesh.Npts}\n2 1 0 {mesh.Npts}\n")
+        np.savetxt(f, np.arange(1, mesh.Npts + 1), fmt="%d")
+        np.savetxt(f, np.column_stack((mesh.coords, np.zeros(mesh.Npts))), fmt="%.17g")
+        f.write("$EndNodes\n")
+
+        num_elements = mesh.Nseg + mesh.Ntri
+        f.write(f"$Elements\n{len(segment_groups) + len(triangle_groups)} {num_elements} 1 {num_elements}\n")
+        first = 1
+        for dim, element_type, groups, nodes, tags in ((1, 1, segment_groups, mesh.segment_nodes, mesh.segment_tags),
+                                                        (2, 2, triangle_groups, mesh.triangle_nodes, mesh.triangle_tags)):
+            for entity, tag in enumerate(groups, start=1):
+                block = nodes[tags == tag]
+                f.write(f"{dim} {entity} {element_type} {len(block)}\n")
+                numbers = np.arange(first, first + len(block))[:, None]
+                np.savetxt(f, np.hstack((numbers, block + 1)), fmt="%d")
+                first += len(block)
+        f.write("$EndElements\n")
+        for name, values in (node_data or {}).items():
+            write_node_data(f, name, values)
+
+
+def write_node_data(f, name: str, values: np.ndarray, chunk: int = 65536) -> None:
+    """
+    Écrit une section $NodeData : un champ aux points, dont les points ont les tags 1 à Npts comme dans write_msh.
+    Les lignes sont écrites par np.savetxt, par blocs de chunk points, pour que la mémoire utilisée ne dépende pas du
+    nombre de points.
+    :param f: le fichier .msh ouvert en écriture (texte)
+    :param name: le nom du champ
+    :param values: les valeurs, tableau (Npts,) ou (Npts, k) pour un champ à k composantes, gmsh n'accepte que
+    k = 1 (scalaire), 3 (vecteur) ou 9 (tenseur)
+    :param chunk: nombre de points écrits à chaque appel de np.savetxt
+    :return: None
+    """
+    values = np.asarray(values, dtype=float)
+    values = values.reshape(len(values), -1)
+    k = values.shape[1]
+    if k not in (1, 3, 9):
+        raise ValueError(f"gmsh n'accepte que 1, 3 ou 9 composantes par point, le champ {name} en a {k}")
+    f.write(f'$NodeData\n1\n"{name}"\n1\n0.0\n3\n0\n{k}\n{len(values)}\n')
+    fmt = " ".join(["%d"] + ["%.17g"] * k)
+    block = np.empty((min(chunk, len(values)), k + 1))
+    for start in range(0, len(values), chunk):
+        rows = values[start:start + chunk]
+        block[:len(rows), 0] = np.arange(start + 1, start + len(rows) + 1)
+        block[:len(rows), 1:] = rows
+        np.savetxt(f, block[:len(rows)], fmt=fmt)
+    f.write("$EndNodeData\n")
@@ -0,0 +1,156 @@
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+from scipy.sparse.linalg import LinearOperator, cg
+
+import assembly
+import boundary
+import mesh_generation
+import solvers
+
+
+def prolongation(n_coarse: int, parents: np.ndarray) -> csr_matrix:
+    """
+    Interpolation P1 du maillage grossier vers le maillage raffiné uniformément : les anciens points gardent leur
+    valeur, chaque milieu prend la moyenne des extrémités de son arête
+    :param n_coarse: nombre de points du maillage grossier
+    :param parents: les extrémités de l'arête de chaque milieu, voir mesh_generation.refine_uniformly
+    :return: matrice creuse (Nfin, Ngrossier)
+    """
+    m = len(parents)
+    rows = np.concatenate((np.arange(n_coarse), np.repeat(np.arange(n_coarse, n_coarse + m), 2)))
+    cols = np.concatenate((np.arange(n_coarse), parents.ravel()))
+    data = np.concatenate((np.ones(n_coarse), np.full(2 * m, 0.5)))
+    return csr_matrix((data, (rows, cols)), shape=(n_coarse + m, n_coarse))
+
+
+class Multigrid:
+    def __init__(self, mesh, levels: int, dirichlet_tag: int = 0, smoothing: int = 2, omega: float = 2 / 3):
+        """
+        Multigrille géométrique pour -Δu = f avec une condition de Dirichlet. La hiérarchie est obtenue en raffinant
+        levels fois le maillage grossier (chaque triangle coupé en quatre), l'opérateur de chaque niveau est la
+        matrice de rigidité P1 assemblée sur ce niveau, et on passe d'un niveau à l'autre par l'interpolation P1
+        (prolongation) et sa transposée (restriction). Les points de Dirichlet ne reçoivent jamais de correction.
+        Un V-cycle coûte O(N) et le nombre de cycles ne dépend presque pas de la finesse du maillage, tant que les
+        triangles du maillage grossier ne sont pas trop aplatis (le lissage de Jacobi s'y dégrade).
+        :param mesh: le maillage grossier, résolu exactement par une factorisation LU
+        :param levels: nombre de raffinements, le système est posé sur le maillage le plus fin (self.mesh)
+        :param dirichlet_tag: le tag physique des segments où la solution est imposée
+        :param smoothing: nombre d'itérations de Jacobi amorti avant et après la correction grossière
+        :param omega: coefficient d'amortissement de Jacobi
+        """
+        self.dirichlet_tag : int = dirichlet_tag
+        self.smoothing : int = smoothing
+        self.omega : float = omega
+        self.meshes : list = [mesh] # du plus grossier au plus fin
+        self.prolongations : list[csr_matrix] = [] # prolongations[l] va du niveau l au niveau l + 1
+        for _ in range(levels):
+            fine, parents = mesh_generation.refine_uniformly(self.meshes[-1])
+            self.prolongations.append(prolongation(self.meshes[-1].Npts, parents))
+            self.meshes.append(fine)
+        self.dirichlet : list[np.ndarray] = [boundary.dirichlet_nodes(m, dirichlet_tag) for m in self.meshes]
+        self.stiffness : csr_matrix = None # matrice du niveau le plus fin avant les conditions aux limites
+        self.operators : list[csr_matrix] = []
+        self.weights : list[np.ndarray] = [] # omega / diagonale, 1 sur les points de Dirichlet
+        for level, m in enumerate(self.meshes):
+            K = assembly.assemble(m).tocsr()
+            A, _ = boundary.apply_dirichlet(K, np.zeros(m.Npts), self.dirichlet[level])
+            weights = self.omega / A.diagonal()
+            weights[self.dirichlet[level]] = 1.0
+            self.operators.append(A)
+            self.weights.append(weights)
+            self.stiffness = K
+        for level, P in enumerate(self.prolongations):
+            # ni correction sur les points de Dirichlet fins, ni contribution des points de Dirichlet grossiers
+            fine_mask = np.ones(P.shape[0])
+            fine_mask[self.dirichlet[level + 1]] = 0
+            coarse_mask = np.ones(P.shape[1])
+            coarse_mask[self.dirichlet[level]] = 0
+            self.prolongations[level] = csr_matrix(diags(fine_mask) @ P @ diags(coarse_mask))
+        self.coarse_solver : solvers.Solver = solvers.Solver(self.operators[0], method="direct")
+        self.info : dict = {}
+
+    @property
+    def mesh(self):
+        return self.meshes[-1]
+
+    @property
+    def A(self) -> csr_matrix:
+        return self.operators[-1]
+
+    def rhs(self, source, g=0.0, order: int = 2) -> np.ndarray:
+        """
+        Second membre du problème sur le maillage le plus fin, conditions aux limites comprises
+        :param source: la fonction source f(x, y), qui doit accepter des tableaux numpy
+        :param g: la valeur imposée au bord, voir boundary.dirichlet_values
+        :param order: le degré de la règle de quadrature
+        :return: tableau (Npts,)
+        """
+        b = assembly.assemble_load_vector(self.mesh, source, order)
+        nodes = self.dirichlet[-1]
+        values = boundary.dirichlet_values(self.mesh, nodes, g)
+        lifted = np.zeros(self.mesh.Npts)
+        lifted[nodes] = values
+        return boundary.lift_rhs(b, self.stiffness @ lifted, nodes, values)
+
+    def vcycle(self, b: np.ndarray, x: np.ndarray = None, level: int = None) -> np.ndarray:
+        """
+        Un V-cycle : lissage, correction calculée récursivement sur le niveau plus grossier, lissage
+        :param b: le second membre du niveau
+        :param x: l'approximation de départ, nulle par défaut
+        :param level: le niveau, le plus fin par défaut
+        :return: la nouvelle approximation
+        """
+        level = len(self.meshes) - 1 if level is None else level
+        if level == 0:
+            return self.coarse_solver.solve(b)
+        A, weights, P = self.operators[level], self.weights[level], self.prolongations[level - 1]
+        x = np.zeros(len(b)) if x is None else x.copy()
+        for _ in range(self.smoothing):
+            x += weights * (b - A @ x)
+        x += P @ self.vcycle(P.T @ (b - A @ x), level=level - 1)
+        for _ in range(self.smoothing):
+            x += weights * (b - A @ x)
+        return x
+
+    def preconditioner(self) -> LinearOperator:
+        """
+        :return: un V-cycle partant de zéro, utilisable comme préconditionneur du gradient conjugué (il est
+        symétrique car le lissage est le même avant et après la correction)
+        """
+        return LinearOperator(self.A.shape, lambda r: self.vcycle(np.ravel(r).astype(float)),
+                              dtype=float)
+
+    def solve(self, b: np.ndarray, method: str = "cg", rtol: float = 1e-10, maxiter: int = 100) -> np.ndarray:
+        """
+        Résout A x = b sur le maillage le plus fin
+        :param b: le second membre, voir rhs
+        :param method: "vcycle" pour enchaîner les V-cycles, "cg" pour le gradient conjugué préconditionné par un
+        V-cycle
+        :param rtol: tolérance relative sur le résidu
+        :param maxiter: nombre maximal de cycles ou d'itérations
+        :return: la solution aux points du maillage le plus fin
+        """
+        if method not in ("vcycle", "cg"):
+            raise ValueError(f"méthode de résolution inconnue : {method}")
+        b = np.asarray(b, dtype=float)
+        norm_b = np.linalg.norm(b)
+        iterations = 0
+        if method == "vcycle":
+            x = np.zeros_like(b)
+            residual = norm_b
+            while residual > rtol * norm_b and iterations < maxiter:
+                x = self.vcycle(b, x)
+                residual = np.linalg.norm(b - self.A @ x)
+                iterations += 1
+            converged = residual <= rtol * norm_b
+        else:
+            def count(_):
+                nonlocal iterations
+                iterations += 1
+
+            x, status = cg(self.A, b, rtol=rtol, maxiter=maxiter, M=self.preconditioner(), callback=count)
+            converged = status == 0
+        residual = float(np.linalg.norm(b - self.A @ x) / norm_b) if norm_b > 0 else float(np.linalg.norm(self.A @ x))
+        self.info = {"method": f"multigrid-{method}", "levels": len(self.meshes), "iterations": iterations,
+                     "residual": residual, "converged": bool(converged)}
+        return x
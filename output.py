@@ -0,0 +1,152 @@
+import os
+import sys
+
+import numpy as np
+
+VTK_TRIANGLE = 5
+VTK_TYPES = {"f8": "Float64", "f4": "Float32", "i4": "Int32", "i8": "Int64", "u1": "UInt8"}
+
+
+def _fields(mesh, point_data: dict, cell_data: dict) -> tuple[dict, dict]:
+    """
+    Prépare les champs à écrire : tableaux contigus, de types connus de VTK, une ligne par point ou par triangle
+    """
+    point_data = {name: np.ascontiguousarray(values) for name, values in (point_data or {}).items()}
+    cell_data = {"physical_tag": mesh.triangle_tags, **(cell_data or {})}
+    cell_data = {name: np.ascontiguousarray(values) for name, values in cell_data.items()}
+    for name, values in point_data.items():
+        if len(values) != mesh.Npts:
+            raise ValueError(f"le champ {name} a {len(values)} valeurs pour {mesh.Npts} points")
+    for name, values in cell_data.items():
+        if len(values) != mesh.Ntri:
+            raise ValueError(f"le champ {name} a {len(values)} valeurs pour {mesh.Ntri} triangles")
+    return point_data, cell_data
+
+
+def _components(values: np.ndarray) -> int:
+    return 1 if values.ndim == 1 else values.shape[1]
+
+
+def write_vtu(mesh, filename: str, point_data: dict = None, cell_data: dict = None) -> None:
+    """
+    Écrit le maillage et des champs au format VTK XML non structuré (.vtu, lisible par ParaView). Les tableaux sont
+    écrits en binaire brut à la suite de l'en-tête XML (AppendedData) directement depuis la mémoire des tableaux numpy,
+    sans conversion en texte.
+    :param mesh: le maillage à écrire
+    :param filename: le nom du fichier
+    :param point_data: champs aux points, {nom: tableau (Npts,) ou (Npts, k)}, par exemple {"u": U}
+    :param cell_data: champs par triangle, {nom: tableau (Ntri,) ou (Ntri, k)}, le tag physique est toujours ajouté
+    :return: None
+    """
+    point_data, cell_data = _fields(mesh, point_data, cell_data)
+    points = np.zeros((mesh.Npts, 3))
+    points[:, :2] = mesh.coords
+    offsets = np.arange(3, 3 * mesh.Ntri + 1, 3, dtype=np.int32)
+    types = np.full(mesh.Ntri, VTK_TRIANGLE, dtype=np.uint8)
+    # VTK n'accepte la connectivité et les décalages qu'à plat, avec une seule composante
+    sections = {"PointData": [(name, values) for name, values in point_data.items()],
+                "CellData": [(name, values) for name, values in cell_data.items()],
+                "Points": [("Points", points)],
+                "Cells": [("connectivity", np.ascontiguousarray(mesh.triangle_nodes).ravel()), ("offsets", offsets),
+                          ("types", types)]}
+    arrays, header, offset = [], [], 0
+    for section, items in sections.items():
+        header.append(f"      <{section}>\n")
+        for name, values in items:
+            header.append(f'        <DataArray type="{VTK_TYPES[values.dtype.str[1:]]}" Name="{name}" '
+                          f'NumberOfComponents="{_components(values)}" format="appended" offset="{offset}"/>\n')
+            arrays.append(values)
+            offset += 8 + values.nbytes # chaque tableau est précédé de sa taille en octets (UInt64)
+        header.append(f"      </{section}>\n")
+    byte_order = "LittleEndian" if sys.byteorder == "little" else "BigEndian"
+    with open(filename, "wb") as f:
+        f.write((f'<?xml version="1.0"?>\n<VTKFile type="UnstructuredGrid" version="1.0" byte_order="{byte_order}" '
+                 f'header_type="UInt64">\n  <UnstructuredGrid>\n'
+                 f'    <Piece NumberOfPoints="{mesh.Npts}" NumberOfCells="{mesh.Ntri}">\n'
+                 + "".join(header) + '    </Piece>\n  </UnstructuredGrid>\n  <AppendedData encoding="raw">\n_')
+                .encode())
+        for values in arrays:
+            f.write(np.uint64(values.nbytes).tobytes())
+            f.write(memoryview(values).cast("B"))
+        f.write(b"\n  </AppendedData>\n</VTKFile>\n")
+
+
+def write_xdmf(mesh, filename: str, point_data: dict = None, cell_data: dict = None) -> None:
+    """
+    Écrit le maillage et des champs au format XDMF : un petit fichier XML qui décrit les tableaux, et un fichier
+    binaire brut par tableau (nom.xdmf -> nom.coords.bin, nom.triangles.bin, nom.point.<champ>.bin et
+    nom.cell.<champ>.bin), écrits d'un bloc avec tofile. Les champs ont leurs propres noms de fichiers, un champ appelé
+    coords ou triangles n'écrase donc pas le maillage. ParaView et VisIt le lisent sans dépendance à HDF5.
+    :param mesh: le maillage à écrire
+    :param filename: le nom du fichier .xdmf, les fichiers binaires sont créés à côté
+    :param point_data: champs aux points, {nom: tableau (Npts,) ou (Npts, k)}
+    :param cell_data: champs par triangle, {nom: tableau (Ntri,) ou (Ntri, k)}, le tag physique est toujours ajouté
+    :return: None
+    """
+    point_data, cell_data = _fields(mesh, point_data, cell_data)
+    stem = os.path.splitext(filename)[0]
+    endian = "Little" if sys.byteorder == "little" else "Big"
+
+    def data_item(name: str, values: np.ndarray) -> str:
+        path = f"{stem}.{name}.bin"
+        values.tofile(path)
+        number_type = {"f": "Float", "i": "Int", "u": "UInt"}[values.dtype.kind]
+        dimensions = " ".join(map(str, values.shape))
+        return (f'<DataItem Format="Binary" Dimensions="{dimensions}" NumberType="{number_type}" '
+                f'Precision="{values.dtype.itemsize}" Endian="{endian}">{os.path.basename(path)}</DataItem>')
+
+    attributes = []
+    for center, prefix, fields in (("Node", "point", point_data), ("Cell", "cell", cell_data)):
+        for name, values in fields.items():
+            kind = "Scalar" if _components(values) == 1 else "Vector"
+            attributes.append(f'      <Attribute Name="{name}" AttributeType="{kind}" Center="{center}">\n'
+                              f'        {data_item(f"{prefix}.{name}", values)}\n      </Attribute>\n')
+    with open(filename, "w") as f:
+        f.write('<?xml version="1.0"?>\n<Xdmf Version="3.0">\n  <Domain>\n    <Grid Name="mesh" GridType="Uniform">\n'
+                f'      <Topology TopologyType="Triangle" NumberOfElements="{mesh.Ntri}">\n'
+                f'        {data_item("triangles", np.ascontiguousarray(mesh.triangle_nodes))}\n      </Topology>\n'
+                f'      <Geometry GeometryType="XY">\n'
+                f'        {data_item("coords", np.ascontiguousarray(mesh.coords))}\n      </Geometry>\n'
+                + "".join(attributes) + "    </Grid>\n  </Domain>\n</Xdmf>\n")
+
+
+def plot_solution(mesh, U: np.ndarray, kind: str = "tripcolor", title: str = "Solution", filename: str = None) -> None:
+    """
+    Affiche la solution directement sur les triangles du maillage, sans la rééchantillonner sur une grille : la
+    solution est affine sur chaque triangle, ce tracé est donc exact. matplotlib n'est importé qu'ici.
+    :param mesh: le maillage
+    :param U: la solution aux points
+    :param kind: "tripcolor" (carte de couleurs 2D, interpolée dans chaque triangle) ou "trisurf" (surface 3D)
+    :param title: le titre de la figure
+    :param filename: si donné, la figure est enregistrée dans ce fichier sans être affichée (utilisable sans écran),
+    sinon elle est affichée avec pyplot
+    :return: None
+    """
+    if kind not in ("tripcolor", "trisurf"):
+        raise ValueError(f"type de tracé inconnu : {kind}")
+    from matplotlib.tri import Triangulation
+
+    if filename is not None:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(10, 8))
+    else:
+        from matplotlib import pyplot as plt
+        fig = plt.figure(figsize=(10, 8))
+    triangulation = Triangulation(mesh.coords[:, 0], mesh.coords[:, 1], mesh.triangle_nodes)
+    if kind == "tripcolor":
+        ax = fig.add_subplot(111)
+        artist = ax.tripcolor(triangulation, U, shading="gouraud", cmap="viridis")
+        ax.set_aspect("equal")
+    else:
+        ax = fig.add_subplot(111, projection="3d")
+        artist = ax.plot_trisurf(triangulation, U, cmap="viridis", edgecolor="none")
+        ax.set_zlabel("sol(x, y)")
+    ax.set_xlabel("x")
+    ax.set_ylabel("y")
+    ax.set_title(title)
+    fig.colorbar(artist, ax=ax, shrink=0.5, aspect=10)
+    fig.tight_layout()
+    if filename is not None:
+        fig.savefig(filename)
+    else:
+        plt.show()
@@ -0,0 +1,165 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+import assembly
+from geometry import Geometry
+
+# Tableaux partagés vus par un processus de travail, remplis une fois par _attach à son démarrage
+_shared : dict = {}
+
+
+class SharedArray:
+    def __init__(self, shape: tuple, dtype, source: np.ndarray = None):
+        """
+        Tableau numpy placé dans un segment de mémoire partagée : les processus de travail y accèdent par son nom,
+        sans copie ni sérialisation des données
+        :param shape: forme du tableau
+        :param dtype: type des éléments
+        :param source: valeurs initiales à recopier, s'il y en a
+        """
+        dtype = np.dtype(dtype)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        self.array : np.ndarray = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        if source is not None:
+            self.array[...] = source
+
+    def spec(self) -> tuple:
+        """
+        :return: (nom, forme, type), ce qu'il faut transmettre à un autre processus pour qu'il retrouve le tableau
+        """
+        return self.shm.name, self.array.shape, self.array.dtype.str
+
+    def release(self) -> None:
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(specs: dict) -> None:
+    """
+    Initialisation d'un processus de travail : ouvre les tableaux partagés
+    """
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _shared[key] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+
+def _element_chunk(start: int, stop: int, stiffness: float, mass: float, f, order: int) -> float:
+    """
+    Première phase, par paquet de triangles : calcule les matrices élémentaires (et les seconds membres élémentaires
+    si f est donnée) des triangles start à stop et les écrit directement dans les tableaux partagés
+    :return: le temps de calcul du paquet, en secondes
+    """
+    wall = time.perf_counter()
+    coords, connectivity = _shared["coords"][1], _shared["triangle_nodes"][1]
+    geometry = Geometry(coords, connectivity[start:stop])
+    if "elementary" in _shared:
+        elementary = _shared["elementary"][1][start:stop]
+        elementary[...] = stiffness * assembly.elementary_stiffness_matrices(geometry)
+        if mass != 0:
+            elementary += mass * assembly.elementary_mass_matrices(geometry)
+    if f is not None:
+        _shared["loads"][1][start:stop] = assembly.element_load_vectors(geometry, f, order)
+    return time.perf_counter() - wall
+
+
+def _scatter_rows(first: int, last: int) -> float:
+    """
+    Seconde phase, par paquet de lignes : somme les contributions élémentaires des triangles autour des points first à
+    last - 1 (lus dans la topologie) dans les lignes correspondantes de la matrice CSR et du second membre partagés.
+    Chaque paquet écrit des lignes qui ne sont qu'à lui, les processus n'ont donc pas à se synchroniser.
+    :return: le temps de calcul du paquet, en secondes
+    """
+    wall = time.perf_counter()
+    connectivity = _shared["triangle_nodes"][1]
+    around_indptr, around = _shared["node_triangles_indptr"][1], _shared["node_triangles"][1]
+    triangles = around[around_indptr[first]:around_indptr[last]]
+    rows = np.repeat(np.arange(first, last, dtype=np.int64), np.diff(around_indptr[first:last + 1]))
+    nodes = connectivity[triangles]
+    local = np.argmax(nodes == rows[:, None], axis=1) # place du point dans chacun de ses triangles
+    if "elementary" in _shared:
+        indptr, indices, data = _shared["indptr"][1], _shared["indices"][1], _shared["data"][1]
+        start, stop = indptr[first], indptr[last]
+        n = len(indptr) - 1
+        keys = np.repeat(np.arange(first, last, dtype=np.int64), np.diff(indptr[first:last + 1])) * n \
+            + indices[start:stop]
+        position = np.searchsorted(keys, rows[:, None] * n + nodes)
+        data[start:stop] = np.bincount(position.ravel(), weights=_shared["elementary"][1][triangles, local].ravel(),
+                                       minlength=stop - start)
+    if "loads" in _shared:
+        _shared["b"][1][first:last] = np.bincount(rows - first, weights=_shared["loads"][1][triangles, local],
+                                                  minlength=last - first)
+    return time.perf_counter() - wall
+
+
+def parallel_assemble(mesh, f=None, stiffness: float = 1.0, mass: float = 0.0, order: int = 2, workers: int = None,
+                      chunk_size: int = None) -> tuple[csr_matrix, np.ndarray, dict]:
+    """
+    Assemble stiffness * K + mass * M et, si f est donnée, le second membre, avec un seul groupe de processus. Les
+    coordonnées, la connectivité et la topologie sont lues par les processus dans de la mémoire partagée, et les
+    résultats y sont écrits directement, seuls les indices des paquets transitent entre les processus :
+        - les matrices et seconds membres élémentaires sont calculés par paquets de triangles ;
+        - puis chaque paquet de lignes somme les contributions de ses points dans la structure CSR de la matrice,
+          qui est le graphe des points (Mesh.node_graph) : il n'y a ni tri des triplets ni réduction dans le
+          processus principal.
+    Le résultat est celui de assembly.assemble(...).tocsr() et assembly.assemble_load_vector, à l'ordre des
+    sommations près. Si stiffness et mass sont nuls, seul le second membre est calculé.
+    :param mesh: le maillage considéré
+    :param f: la fonction source, elle doit pouvoir être transmise à un autre processus (fonction définie au niveau
+    d'un module)
+    :param stiffness: coefficient devant la matrice de rigidité
+    :param mass: coefficient devant la matrice de masse
+    :param order: le degré de la règle de quadrature du second membre
+    :param workers: nombre de processus, par défaut le nombre de cœurs
+    :param chunk_size: nombre de triangles par paquet, par défaut de quoi faire quatre paquets par processus
+    :return: (A, b, timings) où A est la matrice CSR (None si stiffness et mass sont nuls), b le second membre (None
+    si f n'est pas donnée) et timings le temps de chaque phase en secondes : "setup" (structure et mémoire partagée),
+    "elements" et "scatter" (temps écoulé de chaque phase, et somme des temps des paquets dans "*_work")
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, -(-mesh.Ntri // (4 * workers)))
+    matrix = stiffness != 0 or mass != 0
+    wall = time.perf_counter()
+    topology = mesh.topology
+    arrays = {"coords": SharedArray(mesh.coords.shape, np.float64, mesh.coords),
+              "triangle_nodes": SharedArray(mesh.triangle_nodes.shape, np.int32, mesh.triangle_nodes),
+              "node_triangles_indptr": SharedArray((mesh.Npts + 1,), np.int64, topology.node_triangles_indptr),
+              "node_triangles": SharedArray((3 * mesh.Ntri,), np.int32, topology.node_triangles)}
+    if matrix:
+        graph = mesh.node_graph()
+        arrays["elementary"] = SharedArray((mesh.Ntri, 3, 3), np.float64)
+        arrays["indptr"] = SharedArray(graph.indptr.shape, np.int64, graph.indptr)
+        arrays["indices"] = SharedArray(graph.indices.shape, np.int32, graph.indices)
+        arrays["data"] = SharedArray((graph.nnz,), np.float64)
+    if f is not None:
+        arrays["loads"] = SharedArray((mesh.Ntri, 3), np.float64)
+        arrays["b"] = SharedArray((mesh.Npts,), np.float64)
+    # paquets de lignes d'environ chunk_size triangles chacun
+    bounds = np.unique(np.searchsorted(topology.node_triangles_indptr, np.arange(0, 3 * mesh.Ntri, 3 * chunk_size)))
+    bounds = np.append(bounds, mesh.Npts)
+    timings = {"setup": time.perf_counter() - wall}
+    try:
+        specs = {key: array.spec() for key, array in arrays.items()}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(specs,)) as pool:
+            wall = time.perf_counter()
+            futures = [pool.submit(_element_chunk, start, min(start + chunk_size, mesh.Ntri), stiffness, mass, f,
+                                   order) for start in range(0, mesh.Ntri, chunk_size)]
+            timings["elements_work"] = sum(future.result() for future in futures) # propage les erreurs
+            timings["elements"] = time.perf_counter() - wall
+            wall = time.perf_counter()
+            futures = [pool.submit(_scatter_rows, int(first), int(last)) for first, last in zip(bounds[:-1], bounds[1:])]
+            timings["scatter_work"] = sum(future.result() for future in futures)
+            timings["scatter"] = time.perf_counter() - wall
+        A = None
+        if matrix:
+            A = csr_matrix((arrays["data"].array.copy(), graph.indices, graph.indptr), shape=(mesh.Npts, mesh.Npts))
+        b = arrays["b"].array.copy() if f is not None else None
+        return A, b, timings
+    finally:
+        for array in arrays.values():
+            array.release()
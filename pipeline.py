@@ -0,0 +1,131 @@
+import numpy as np
+
+import assembly
+import boundary
+import evaluation
+import parallel
+import solvers
+from instrumentation import Instrumentation
+from mesh import Mesh
+
+
+class Pipeline:
+    def __init__(self, mesh_path: str, source, backend: str = "gmsh", cache_dir: str = None, method: str = "direct",
+                 preconditioner: str = "jacobi", order: int = 2, dirichlet_tag: int = 0, g=0.0, renumber: str = None,
+                 workers: int = None, instrumentation: Instrumentation = None):
+        """
+        Les étapes de la résolution de -Δu = f avec u = g au bord, dans l'ordre de main.py. Chaque étape est une
+        méthode nommée, mesurée par l'instrumentation si elle est active, et range son résultat dans un attribut.
+        :param mesh_path: le fichier .msh du maillage
+        :param source: la fonction source f(x, y), qui doit accepter des tableaux numpy (et, si workers est donné,
+        pouvoir être transmise à un autre processus : fonction définie au niveau d'un module)
+        :param backend: lecteur du maillage, voir Mesh.GmshToMesh
+        :param cache_dir: dossier du cache binaire du maillage, voir Mesh.GmshToMesh
+        :param method: méthode de résolution, voir solvers.Solver
+        :param preconditioner: préconditionneur du gradient conjugué, voir solvers.Solver
+        :param order: le degré de la règle de quadrature du second membre
+        :param dirichlet_tag: le tag physique des segments où la solution est imposée
+        :param g: la valeur imposée au bord, voir boundary.dirichlet_values
+        :param renumber: méthode de renumérotation des points appliquée après la lecture ("rcm"), voir Mesh.renumber
+        :param workers: nombre de processus pour l'assemblage de la matrice et du second membre, faits ensemble par
+        assemble_parallel (voir parallel.parallel_assemble), assemblage dans le processus courant si rien n'est donné
+        :param instrumentation: les mesures par étape, désactivées si rien n'est donné
+        """
+        self.mesh_path : str = mesh_path
+        self.source = source
+        self.backend : str = backend
+        self.cache_dir : str = cache_dir
+        self.method : str = method
+        self.preconditioner : str = preconditioner
+        self.order : int = order
+        self.dirichlet_tag : int = dirichlet_tag
+        self.g = g
+        self.renumber : str = renumber
+        self.workers : int = workers
+        self.instrumentation : Instrumentation = instrumentation or Instrumentation(enabled=False)
+        self.mesh : Mesh = None
+        self.A = None # matrice du système, au format CSR
+        self.B : np.ndarray = None # second membre
+        self.solver : solvers.Solver = None
+        self.U : np.ndarray = None # solution aux points du maillage (numérotation de self.mesh)
+        self.solution : evaluation.FESolution = None
+
+    def load_mesh(self) -> Mesh:
+        with self.instrumentation.stage("mesh_import", backend=self.backend) as record:
+            self.mesh = Mesh()
+            self.mesh.GmshToMesh(self.mesh_path, backend=self.backend, cache_dir=self.cache_dir)
+            record.update(Npts=self.mesh.Npts, Ntri=self.mesh.Ntri, Nseg=self.mesh.Nseg)
+        return self.mesh
+
+    def renumber_nodes(self) -> dict:
+        with self.instrumentation.stage("renumbering", method=self.renumber) as record:
+            record.update(self.mesh.renumber(self.renumber))
+        return record
+
+    def assemble_stiffness(self):
+        with self.instrumentation.stage("stiffness_assembly", Ntri=self.mesh.Ntri) as record:
+            self.A = assembly.assemble(self.mesh, stiffness=1, mass=0).tocsr()
+            record["nnz"] = self.A.nnz
+        return self.A
+
+    def assemble_rhs(self) -> np.ndarray:
+        with self.instrumentation.stage("rhs_integration", Ntri=self.mesh.Ntri, order=self.order):
+            self.B = assembly.assemble_load_vector(self.mesh, self.source, order=self.order)
+        return self.B
+
+    def assemble_parallel(self):
+        """
+        Assemble la matrice et le second membre en une seule fois avec workers processus, les temps de chaque phase
+        (voir parallel.parallel_assemble) sont ajoutés aux mesures de l'étape
+        """
+        with self.instrumentation.stage("parallel_assembly", Ntri=self.mesh.Ntri, order=self.order,
+                                        workers=self.workers) as record:
+            self.A, self.B, timings = parallel.parallel_assemble(self.mesh, self.source, stiffness=1, mass=0,
+                                                                 order=self.order, workers=self.workers)
+            record.update({f"{phase}_s": seconds for phase, seconds in timings.items()}, nnz=self.A.nnz)
+        return self.A, self.B
+
+    def apply_dirichlet(self):
+        with self.instrumentation.stage("dirichlet", physical_tag=self.dirichlet_tag) as record:
+            nodes = boundary.dirichlet_nodes(self.mesh, self.dirichlet_tag)
+            values = boundary.dirichlet_values(self.mesh, nodes, self.g)
+            self.A, self.B = boundary.apply_dirichlet(self.A, self.B, nodes, values)
+            record.update(dirichlet_nodes=len(nodes), nnz=self.A.nnz)
+        return self.A, self.B
+
+    def solve(self) -> np.ndarray:
+        with self.instrumentation.stage("solve", method=self.method, Npts=self.mesh.Npts) as record:
+            self.solver = solvers.Solver(self.A, method=self.method, preconditioner=self.preconditioner)
+            self.U = self.solver.solve(self.B)
+            record.update(self.solver.info)
+        return self.U
+
+    def build_evaluator(self) -> evaluation.FESolution:
+        with self.instrumentation.stage("evaluation_index", Ntri=self.mesh.Ntri):
+            self.solution = evaluation.FESolution(self.mesh, self.U)
+        return self.solution
+
+    @property
+    def U_original(self) -> np.ndarray:
+        """
+        La solution dans la numérotation des points du fichier .msh, même si les points ont été renumérotés
+        :return: tableau (Npts,)
+        """
+        return self.mesh.restore_order(self.U)
+
+    def run(self) -> evaluation.FESolution:
+        """
+        Exécute toutes les étapes dans l'ordre
+        :return: la solution, évaluable en tout point
+        """
+        self.load_mesh()
+        if self.renumber is not None:
+            self.renumber_nodes()
+        if self.workers is None:
+            self.assemble_stiffness()
+            self.assemble_rhs()
+        else:
+            self.assemble_parallel()
+        self.apply_dirichlet()
+        self.solve()
+        return self.build_evaluator()
@@ -1,8 +1,13 @@
+import numpy as np
+
+
 class Point:
 
     N : int
     name : str = "Point"
 
+    __slots__ = ("_coords", "_mesh", "id") # pas de __dict__ : un point ne coûte que trois références
+
     def __init__(self, x:float, y:float, id:int):
         """
         La classe point représente les points du maillage 2D
@@ -11,10 +16,55 @@ class Point:
         :param id: l'id est un paramètre unique permettant de trouver de quel point on parle, il est
         particulièrement utile pour le calcul matriciel
         """
-        self.x : float = x
-        self.y : float = y
+        self._coords : np.ndarray = np.array([x, y], dtype=float) # un point isolé possède son propre tableau
+        self._mesh = None # maillage dont le point est une vue, None pour un point isolé
         self.id : int = id
 
+    @classmethod
+    def view(cls, mesh, id:int) -> "Point":
+        """
+        Crée un point qui ne stocke pas ses coordonnées mais lit directement la ligne id du tableau de coordonnées du
+        maillage, c'est ainsi que Mesh expose ses points. Modifier x ou y écrit dans mesh.coords et invalide la
+        géométrie du maillage.
+        :param mesh: le maillage
+        :param id: l'identifiant du point, qui est aussi sa ligne dans le tableau
+        :return: Point
+        """
+        point = cls.__new__(cls)
+        point._mesh = mesh
+        point.id = id
+        return point
+
+    @property
+    def coords(self) -> np.ndarray:
+        """
+        :return: les coordonnées (x, y) du point, vue sur le tableau du maillage pour un point du maillage
+        """
+        return self._coords if self._mesh is None else self._mesh.coords[self.id]
+
+    def _set(self, axis:int, value:float) -> None:
+        if self._mesh is None:
+            self._coords[axis] = value
+            return
+        self._mesh.coords[self.id, axis] = value
+        self._mesh.invalidate_geometry() # aires et jacobiens dépendent des coordonnées
+
+    @property
+    def x(self) -> float:
+        return float(self.coords[0])
+
+    @x.setter
+    def x(self, value:float) -> None:
+        self._set(0, value)
+
+    @property
+    def y(self) -> float:
+        return float(self.coords[1])
+
+    @y.setter
+    def y(self, value:float) -> None:
+        self._set(1, value)
+
     def __str__(self):
         return f"Point({self.x}, {self.y})"
 
@@ -23,7 +73,8 @@ class Point:
         Permet d'obtenir les coordonnées d'un point
         :return: un tuple (int,int)
         """
-        return self.x, self.y
+        x, y = self.coords.tolist()
+        return x, y
 
     def get_id(self) -> int:
         """
@@ -0,0 +1,66 @@
+import numpy as np
+
+import assembly
+import boundary
+import solvers
+
+
+class PoissonProblem:
+    def __init__(self, mesh, dirichlet_tag: int = 0, g=0.0, reaction: float = 0.0, method: str = "direct",
+                 preconditioner: str = "jacobi", order: int = 2):
+        """
+        Problème -Δu + reaction * u = f sur le maillage avec u = g sur les segments de tag physique dirichlet_tag.
+        Tout ce qui ne dépend pas de la source (matrice, élimination des conditions aux limites, relèvement et
+        factorisation) est fait une seule fois, on peut ensuite résoudre pour autant de sources que l'on veut : k
+        résolutions ne coûtent qu'une factorisation et k descentes-remontées.
+        :param mesh: le maillage considéré
+        :param dirichlet_tag: le tag physique des segments du bord où la solution est imposée
+        :param g: la valeur imposée, constante, tableau (une valeur par point de Dirichlet) ou fonction g(x, y)
+        :param reaction: coefficient devant la matrice de masse (0 pour le problème de Poisson)
+        :param method: méthode de résolution, voir solvers.Solver
+        :param preconditioner: préconditionneur du gradient conjugué, voir solvers.Solver
+        :param order: le degré de la règle de quadrature des seconds membres
+        """
+        self.mesh = mesh
+        self.order : int = order
+        self.dirichlet : np.ndarray = boundary.dirichlet_nodes(mesh, dirichlet_tag)
+        self.g : np.ndarray = boundary.dirichlet_values(mesh, self.dirichlet, g)
+        A = assembly.assemble(mesh, stiffness=1, mass=reaction).tocsr()
+        lifted = np.zeros(mesh.Npts)
+        lifted[self.dirichlet] = self.g
+        self.lift : np.ndarray = A @ lifted # relèvement A g, le même pour toutes les sources
+        self.A, _ = boundary.apply_dirichlet(A, np.zeros(mesh.Npts), self.dirichlet, self.g)
+        self.solver : solvers.Solver = solvers.Solver(self.A, method, preconditioner)
+        self._mass = None # matrice de masse, assemblée au premier second membre donné par ses valeurs aux points
+
+    def rhs(self, sources) -> np.ndarray:
+        """
+        Seconds membres, conditions aux limites comprises
+        :param sources: une fonction f(x, y), ou plusieurs sous l'une des formes acceptées par
+        assembly.assemble_load_vectors
+        :return: tableau (Npts,) pour une seule fonction, (Npts, k) sinon
+        """
+        if callable(sources):
+            b = assembly.assemble_load_vector(self.mesh, sources, self.order)
+        else:
+            b = assembly.assemble_load_vectors(self.mesh, sources, self.order, mass=self._mass_for(sources))
+        return boundary.lift_rhs(b, self.lift, self.dirichlet, self.g)
+
+    def _mass_for(self, sources):
+        """
+        :return: la matrice de masse si sources est un tableau de valeurs aux points (assemblée une seule fois),
+        None sinon
+        """
+        if not isinstance(sources, np.ndarray) or sources.ndim > 2:
+            return None
+        if self._mass is None:
+            self._mass = assembly.assemble(self.mesh, stiffness=0, mass=1).tocsr()
+        return self._mass
+
+    def solve(self, sources) -> np.ndarray:
+        """
+        Résout le problème pour une ou plusieurs sources avec la même factorisation
+        :param sources: voir rhs
+        :return: la solution aux points, (Npts,) ou (Npts, k) avec une colonne par source
+        """
+        return self.solver.solve(self.rhs(sources))
@@ -5,6 +5,9 @@ from point import Point
 class Segment:
     N : int
     name : str = "Segment"
+
+    __slots__ = ("_p", "_mesh", "id", "_physical_tag")
+
     def __init__(self, points : list[Point], id : int, physical_tag : int=-1):
         """
         La classe représente les éléments 1d du maillage triangulaire c'est à dire les segments
@@ -13,16 +16,45 @@ class Segment:
         :param physical_tag: c'est un paramètre utile dans gmsh qui permet de séparer les objets par groupe, on s'en
         sert ici principalement pour différencier les objets du bord (de tag 0) du reste (de tag -1).
         """
-        self.p : list[Point] = points
+        self._p : list[Point] = points
+        self._mesh = None # un segment isolé ne dépend d'aucun maillage
         self.id : int = id
-        self.physical_tag : int = physical_tag
+        self._physical_tag : int = physical_tag
+
+    @classmethod
+    def view(cls, mesh, id:int) -> "Segment":
+        """
+        Crée un segment qui lit ses sommets et son tag physique directement dans les tableaux du maillage
+        :param mesh: le maillage qui contient le segment
+        :param id: l'identifiant du segment, qui est aussi sa ligne dans mesh.segment_nodes
+        :return: Segment
+        """
+        segment = cls.__new__(cls)
+        segment._p = None
+        segment._mesh = mesh
+        segment.id = id
+        segment._physical_tag = None
+        return segment
+
+    @property
+    def p(self) -> list[Point]:
+        if self._mesh is None:
+            return self._p
+        return [Point.view(self._mesh, i) for i in self._mesh.segment_nodes[self.id].tolist()]
+
+    @property
+    def physical_tag(self) -> int:
+        if self._mesh is None:
+            return self._physical_tag
+        return int(self._mesh.segment_tags[self.id])
 
     def area(self) -> np.floating:
         """
         Calcul de l'aire du rectangle (c'est-à-dire sa longueur)
         :return: float
         """
-        return  np.linalg.norm(np.array(self.p[0].get_coord()) - np.array(self.p[1].get_coord()))
+        (x1, y1), (x2, y2) = [p.get_coord() for p in self.p]
+        return np.hypot(x2 - x1, y2 - y1)
 
     def jac(self) -> np.floating:
         """
@@ -39,4 +71,4 @@ class Segment:
         :param i: permet de choisir le sommet voulu
         :return: Point
         """
-        return self.p[i-1]
\ No newline at end of file
+        return self.p[i-1]
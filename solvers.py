@@ -0,0 +1,98 @@
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+from scipy.sparse.linalg import LinearOperator, cg, spilu, splu
+
+
+class Solver:
+    def __init__(self, A, method: str = "direct", preconditioner: str = "jacobi", rtol: float = 1e-10,
+                 maxiter: int = None, permc_spec: str = "COLAMD"):
+        """
+        Cette classe résout les systèmes A x = b directement sur la matrice creuse, sans jamais la convertir en
+        matrice pleine. La factorisation (ou le préconditionneur) n'est calculée qu'au premier appel de solve puis
+        gardée en mémoire, les résolutions suivantes avec d'autres seconds membres ne coûtent donc qu'une descente et
+        une remontée triangulaires (ou les itérations du gradient conjugué).
+        :param A: la matrice du système (n'importe quel format scipy.sparse, convertie en CSR)
+        :param method: "direct" pour une factorisation LU creuse (splu), "cg" pour le gradient conjugué préconditionné,
+        réservé aux matrices symétriques définies positives comme celle du problème de Laplace
+        :param preconditioner: préconditionneur du gradient conjugué : "jacobi" (inverse de la diagonale), "ilu"
+        (factorisation LU incomplète spilu) ou None
+        :param rtol: tolérance relative sur le résidu pour le gradient conjugué
+        :param maxiter: nombre maximal d'itérations du gradient conjugué
+        :param permc_spec: ordre des colonnes de splu, qui fixe le remplissage des facteurs LU : "COLAMD" (défaut de
+        scipy), "MMD_AT_PLUS_A" (moins de remplissage sur une matrice symétrique, mais ordre lent à calculer sur les
+        grands maillages), "MMD_ATA" ou "NATURAL" (numérotation des points telle quelle)
+        """
+        if method not in ("direct", "cg"):
+            raise ValueError(f"méthode de résolution inconnue : {method}")
+        if preconditioner not in ("jacobi", "ilu", None):
+            raise ValueError(f"préconditionneur inconnu : {preconditioner}")
+        self.A : csr_matrix = csr_matrix(A)
+        self.method : str = method
+        self.preconditioner : str = preconditioner
+        self.rtol : float = rtol
+        self.maxiter : int = maxiter
+        self.permc_spec : str = permc_spec
+        self._factorization = None # factorisation LU ou préconditionneur, calculé une seule fois
+        self._factorized : bool = False
+        self.info : dict = {} # informations sur la dernière résolution (itérations, résidu, convergence)
+
+    def factorize(self) -> None:
+        """
+        Calcule la factorisation LU (méthode directe) ou le préconditionneur (gradient conjugué) si ce n'est pas déjà
+        fait
+        :return: None
+        """
+        if self._factorized:
+            return
+        if self.method == "direct":
+            self._factorization = splu(self.A.tocsc(), permc_spec=self.permc_spec)
+        elif self.preconditioner == "jacobi":
+            self._factorization = diags(1 / self.A.diagonal())
+        elif self.preconditioner == "ilu":
+            ilu = spilu(self.A.tocsc(), drop_tol=1e-4, fill_factor=10)
+            self._factorization = LinearOperator(self.A.shape, ilu.solve)
+        self._factorized = True
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        """
+        Résout A x = b
+        :param b: le second membre, de forme (N,) ou (N, k) pour k seconds membres
+        :return: la solution, de même forme que b
+        """
+        self.factorize()
+        b = np.asarray(b, dtype=float)
+        if self.method == "direct":
+            x = self._factorization.solve(b)
+            self.info = {"method": "direct", "iterations": 0, "residual": self.residual(x, b), "converged": True}
+            return x
+        if b.ndim == 2:
+            columns, infos = [], []
+            for j in range(b.shape[1]):
+                columns.append(self.solve(b[:, j]))
+                infos.append(self.info)
+            self.info = {"method": "cg", "iterations": [info["iterations"] for info in infos],
+                         "residual": max(info["residual"] for info in infos),
+                         "converged": all(info["converged"] for info in infos)}
+            return np.stack(columns, axis=1)
+        iterations = 0
+
+        def count(_):
+            nonlocal iterations
+            iterations += 1
+
+        x, status = cg(self.A, b, rtol=self.rtol, maxiter=self.maxiter, M=self._factorization,
+                       callback=count)
+        self.info = {"method": "cg", "preconditioner": self.preconditioner, "iterations": iterations,
+                     "residual": self.residual(x, b), "converged": status == 0}
+        return x
+
+    def residual(self, x: np.ndarray, b: np.ndarray) -> float:
+        """
+        Résidu relatif ||b - A x|| / ||b||
+        :param x: la solution approchée
+        :param b: le second membre
+        :return: float
+        """
+        norm_b = np.linalg.norm(b)
+        return float(np.linalg.norm(b - self.A @ x) / norm_b) if norm_b > 0 else float(np.linalg.norm(self.A @ x))
+
@@ -0,0 +1,116 @@
+import numpy as np
+
+
+def _csr(rows: np.ndarray, values: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Range des couples (ligne, valeur) au format CSR : les valeurs de la ligne i sont values[indptr[i]:indptr[i + 1]],
+    dans l'ordre où elles apparaissent
+    :return: (indptr, valeurs triées par ligne)
+    """
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, np.ascontiguousarray(values[order], dtype=np.int32)
+
+
+class Topology:
+    # tableaux qui décrivent entièrement la topologie, enregistrés avec le maillage dans le cache binaire
+    ARRAYS : tuple = ("node_triangles_indptr", "node_triangles", "node_neighbors_indptr", "node_neighbors", "edges",
+                      "triangle_edges", "edge_triangles", "segment_edges", "boundary_tags", "boundary_nodes_indptr",
+                      "boundary_nodes")
+
+    def __init__(self, Npts: int, triangle_nodes: np.ndarray, segment_nodes: np.ndarray, segment_tags: np.ndarray):
+        """
+        Adjacences du maillage, calculées une seule fois et de façon vectorisée. Mesh en garde une instance
+        (Mesh.topology) : toute question topologique (triangles autour d'un point, voisins d'un point, triangles de
+        part et d'autre d'une arête, points d'un bord) devient une lecture dans un tableau au lieu d'un parcours du
+        maillage. Les adjacences de longueur variable sont au format CSR : les triangles du point i sont
+        node_triangles[node_triangles_indptr[i]:node_triangles_indptr[i + 1]].
+        :param Npts: nombre de points
+        :param triangle_nodes: tableau (Ntri, 3) des sommets de chaque triangle
+        :param segment_nodes: tableau (Nseg, 2) des extrémités de chaque segment
+        :param segment_tags: tag physique de chaque segment
+        """
+        nodes = np.asarray(triangle_nodes, dtype=np.int64)
+        Ntri = len(nodes)
+        # point -> triangles
+        self.node_triangles_indptr, self.node_triangles = _csr(nodes.ravel(), np.repeat(np.arange(Ntri), 3), Npts)
+
+        # arêtes uniques (a < b), l'arête k d'un triangle est celle opposée à son sommet k
+        a = nodes[:, [1, 2, 0]].ravel()
+        b = nodes[:, [2, 0, 1]].ravel()
+        keys, triangle_edges = np.unique(np.minimum(a, b) * Npts + np.maximum(a, b), return_inverse=True)
+        self.edges : np.ndarray = np.column_stack((keys // Npts, keys % Npts)).astype(np.int32)
+        self.triangle_edges : np.ndarray = triangle_edges.reshape(Ntri, 3).astype(np.int32)
+        # les (au plus) deux triangles de chaque arête, -1 s'il n'y en a qu'un (arête du bord)
+        indptr, triangles = _csr(triangle_edges.ravel(), np.repeat(np.arange(Ntri), 3), len(keys))
+        self.edge_triangles : np.ndarray = np.full((len(keys), 2), -1, dtype=np.int32)
+        self.edge_triangles[:, 0] = triangles[indptr[:-1]]
+        shared = np.diff(indptr) > 1
+        self.edge_triangles[shared, 1] = triangles[indptr[:-1][shared] + 1]
+
+        # point -> points voisins (reliés par une arête), triés
+        rows = np.concatenate((self.edges[:, 0], self.edges[:, 1]))
+        cols = np.concatenate((self.edges[:, 1], self.edges[:, 0]))
+        order = np.lexsort((cols, rows))
+        self.node_neighbors_indptr, self.node_neighbors = _csr(rows[order], cols[order], Npts)
+
+        # arête de chaque segment, -1 si le segment n'est le côté d'aucun triangle
+        s = np.asarray(segment_nodes, dtype=np.int64)
+        segment_keys = np.minimum(s[:, 0], s[:, 1]) * Npts + np.maximum(s[:, 0], s[:, 1])
+        position = np.searchsorted(keys, segment_keys)
+        found = position < len(keys)
+        found[found] = keys[position[found]] == segment_keys[found]
+        self.segment_edges : np.ndarray = np.where(found, position, -1).astype(np.int32)
+
+        # points des segments de chaque tag physique, triés et sans doublon
+        self.boundary_tags, tag_index = np.unique(segment_tags, return_inverse=True)
+        boundary = np.unique(tag_index.astype(np.int64)[:, None] * Npts + s)
+        starts = np.arange(len(self.boundary_tags) + 1) * Npts
+        self.boundary_nodes_indptr : np.ndarray = np.searchsorted(boundary, starts)
+        self.boundary_nodes : np.ndarray = (boundary % max(Npts, 1)).astype(np.int32)
+
+    @classmethod
+    def from_arrays(cls, arrays: dict):
+        """
+        Reconstruit la topologie à partir de ses tableaux (voir ARRAYS), sans rien recalculer
+        :param arrays: nom -> tableau
+        :return: Topology
+        """
+        topology = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(topology, name, arrays[name])
+        return topology
+
+    @property
+    def Nedge(self) -> int:
+        return len(self.edges)
+
+    def triangles_of(self, node: int) -> np.ndarray:
+        """
+        :return: les id des triangles qui ont le point node pour sommet
+        """
+        return self.node_triangles[self.node_triangles_indptr[node]:self.node_triangles_indptr[node + 1]]
+
+    def neighbors_of(self, node: int) -> np.ndarray:
+        """
+        :return: les id des points reliés à node par une arête, triés
+        """
+        return self.node_neighbors[self.node_neighbors_indptr[node]:self.node_neighbors_indptr[node + 1]]
+
+    def boundary_nodes_of(self, physical_tag: int) -> np.ndarray:
+        """
+        :param physical_tag: le tag physique des segments du bord
+        :return: tableau trié des id des points de ces segments, vide si aucun segment n'a ce tag
+        """
+        i = int(np.searchsorted(self.boundary_tags, physical_tag))
+        if i == len(self.boundary_tags) or self.boundary_tags[i] != physical_tag:
+            return np.empty(0, dtype=np.int32)
+        return self.boundary_nodes[self.boundary_nodes_indptr[i]:self.boundary_nodes_indptr[i + 1]]
+
+    @property
+    def boundary_edges(self) -> np.ndarray:
+        """
+        :return: les id des arêtes qui n'ont qu'un triangle
+        """
+        return np.flatnonzero(self.edge_triangles[:, 1] < 0)
@@ -1,16 +1,14 @@
-import math
-
 import numpy as np
-from fontTools.misc.bezierTools import epsilon
 
 import fem_utils
 from point import Point
-from segment import Segment
 
 class Triangle:
     N: int
     name: str = "Triangle"
 
+    __slots__ = ("_points", "_mesh", "id", "_physical_tag")
+
     def __init__(self, points: list[Point], id: int, physical_tag: int = -1):
         """
         La classe représente les éléments 2d du maillage triangulaire c'est-à-dire les triangles
@@ -21,9 +19,37 @@ class Triangle:
         (Le paramètre est ici uniquement présent pour la modularité du code, si l'on voulait implémenter les
         éléments finis en 3d.)
         """
-        self.points = points
+        self._points = points
+        self._mesh = None # un triangle isolé ne dépend d'aucun maillage
         self.id = id
-        self.physical_tag = physical_tag
+        self._physical_tag = physical_tag
+
+    @classmethod
+    def view(cls, mesh, id: int) -> "Triangle":
+        """
+        Crée un triangle qui lit ses sommets et son tag physique directement dans les tableaux du maillage
+        :param mesh: le maillage qui contient le triangle
+        :param id: l'identifiant du triangle, qui est aussi sa ligne dans mesh.triangle_nodes
+        :return: Triangle
+        """
+        triangle = cls.__new__(cls)
+        triangle._points = None
+        triangle._mesh = mesh
+        triangle.id = id
+        triangle._physical_tag = None
+        return triangle
+
+    @property
+    def points(self) -> list[Point]:
+        if self._mesh is None:
+            return self._points
+        return [Point.view(self._mesh, i) for i in self._mesh.triangle_nodes[self.id].tolist()]
+
+    @property
+    def physical_tag(self) -> int:
+        if self._mesh is None:
+            return self._physical_tag
+        return int(self._mesh.triangle_tags[self.id])
 
     def get_boundary(self,i:int) -> Point:
         """
@@ -36,14 +62,14 @@ class Triangle:
 
     def area(self) -> float:
         """
-        Calcul de l'aire du triangle à l'aide de la formule de Héron
+        Calcul de l'aire du triangle à l'aide du déterminant des deux côtés issus du premier sommet, ce qui évite
+        les segments temporaires et la perte de précision de la formule de Héron sur les triangles aplatis
         :return: floating
         """
-        s1 = Segment([self.points[0], self.points[1]],-1)
-        s2 = Segment([self.points[1], self.points[2]],-1)
-        s3 = Segment([self.points[2], self.points[0]],-1)
-        demi_par = (s1.area() + s2.area() + s3.area())/2
-        return math.sqrt(demi_par* (demi_par-s1.area()) * (demi_par-s2.area()) * (demi_par-s3.area()))
+        if self._mesh is not None:
+            return float(self._mesh.geometry.area[self.id]) # un triangle du maillage lit l'aire en cache
+        (x1, y1), (x2, y2), (x3, y3) = [p.get_coord() for p in self.points]
+        return abs((x2 - x1) * (y3 - y1) - (x3 - x1) * (y2 - y1)) / 2
 
     def jac(self) -> float:
         """
@@ -55,29 +81,12 @@ class Triangle:
     def gaussPoint(self, order:int=2) -> float:
         """
         Calcul des informations nécéssaires à la quadrature de Gauss
-        :param order: On demande l'ordre de précision, ici seul l'ordre 2 est implémenté car il suffit amplement
+        :param order: On demande l'ordre de précision, c'est-à-dire le degré des polynômes intégrés exactement (de 1
+        à 5, voir fem_utils.quadrature), l'ordre 2 suffit amplement pour des seconds membres réguliers
         :return: (float,float,float,float) (du type (eta,nu,omega,point de gauss)
         """
-        eta = []
-        nu = []
-        omega =[]
-        gauss_point = []
-        if order == 2:
-            eta = [1/6,4/6,1/6]
-            nu = [1/6,1/6,4/6]
-            omega = [1/6,1/6,1/6]
-            for m in range(3):
-                sum = 0
-                for i in range(1,4):
-                    x,y =self.get_boundary(i).get_coord()
-                    sum += np.array([[x,y]]) * fem_utils.psi(eta[m],nu[m], i)
-                gauss_point.append(sum)
-
-        return eta, nu, omega, gauss_point
-
-
-
-
-
-
-
+        points, weights = fem_utils.quadrature(order)
+        coords = np.array([p.get_coord() for p in self.points])
+        # chaque point de Gauss est la combinaison des sommets pondérée par les fonctions de forme de référence
+        gauss_point = [row[None, :] for row in fem_utils.reference_shape_values(points) @ coords]
+        return points[:, 0].tolist(), points[:, 1].tolist(), weights.tolist(), gauss_point
@@ -1,12 +1,44 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
 class Triplets:
-    def __init__(self):
+    def __init__(self, capacity: int = 0, shape: tuple = None):
         """
         Le but de cette classe est de créer une structure de données pouvant être modifiée à la volée et contenir des doublons
         afin d'ensuite obtenir une matrice COO et CSR.
+        Les coefficients sont rangés dans trois tableaux numpy typés (int32 pour les indices, float64 pour les
+        valeurs), préalloués si l'on connaît leur nombre (9 * Ntri pour une matrice P1) et agrandis par doublement sinon.
+        :param capacity: nombre de coefficients à préallouer
+        :param shape: taille de la matrice, déduite des indices si elle n'est pas donnée
         """
-        self.data : tuple = ([], ([],[])) # on crée la structure de données qui représente les coefficients non nuls d'une matrice
+        self.rows : np.ndarray = np.empty(capacity, dtype=np.int32) # lignes des coefficients non nuls
+        self.cols : np.ndarray = np.empty(capacity, dtype=np.int32) # colonnes des coefficients non nuls
+        self.vals : np.ndarray = np.empty(capacity, dtype=np.float64) # valeurs des coefficients non nuls
+        self.size : int = 0 # nombre de coefficients effectivement remplis
+        self.shape : tuple = shape
+
     def __str__(self):
-        return str(self.data)
+        return str(self.getData())
+
+    def __len__(self):
+        return self.size
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Agrandit les tableaux pour pouvoir contenir au moins capacity coefficients
+        :param capacity: le nombre de coefficients voulu
+        :return: None
+        """
+        if capacity <= len(self.vals):
+            return
+        capacity = max(capacity, 2 * len(self.vals))
+        for name in ("rows", "cols", "vals"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
     def append(self, i:int, j:int, val:float) -> None:
         """
 
@@ -15,13 +47,98 @@ class Triplets:
         :param val: la valeur de coefficient
         :return: None
         """
-        self.data[1][0].append(i)
-        self.data[1][1].append(j)
-        self.data[0].append(val)
+        self.reserve(self.size + 1)
+        self.rows[self.size] = i
+        self.cols[self.size] = j
+        self.vals[self.size] = val
+        self.size += 1
+
+    def extend(self, rows, cols, vals) -> None:
+        """
+        Ajoute d'un seul coup un lot de coefficients, par exemple toutes les matrices élémentaires du maillage
+        :param rows: les lignes des coefficients (tableau numpy)
+        :param cols: les colonnes des coefficients (tableau numpy)
+        :param vals: les valeurs des coefficients (tableau numpy)
+        :return: None
+        """
+        n = len(vals)
+        self.reserve(self.size + n)
+        self.rows[self.size:self.size + n] = rows
+        self.cols[self.size:self.size + n] = cols
+        self.vals[self.size:self.size + n] = vals
+        self.size += n
+
+    def extend_blocks(self, connectivity: np.ndarray, blocks: np.ndarray) -> None:
+        """
+        Ajoute des matrices élémentaires entières : le bloc b est ajouté aux lignes et colonnes connectivity[b]
+        :param connectivity: tableau (Nelem, k) des sommets de chaque élément
+        :param blocks: tableau (Nelem, k, k) des matrices élémentaires
+        :return: None
+        """
+        k = connectivity.shape[1]
+        self.extend(np.repeat(connectivity, k, axis=1).ravel(), np.tile(connectivity, (1, k)).ravel(), blocks.ravel())
 
     def getData(self):
         """
         Permet de récupérer la structure de données.
-        :return: tupple(List, tupple(list, List))
+        :return: tupple(array, tupple(array, array)), directement utilisable par scipy.sparse.coo_matrix
+        """
+        return self.vals[:self.size], (self.rows[:self.size], self.cols[:self.size])
+
+    @property
+    def data(self):
+        return self.getData()
+
+    def _shape(self, shape: tuple = None) -> tuple:
+        if shape is not None:
+            return shape
+        if self.shape is not None:
+            return self.shape
+        n = int(max(self.rows[:self.size].max(initial=-1), self.cols[:self.size].max(initial=-1))) + 1
+        return n, n
+
+    def tocsr(self, shape: tuple = None) -> csr_matrix:
+        """
+        Convertit les triplets en matrice CSR, les doublons sont sommés
+        :param shape: taille de la matrice (voir le constructeur)
+        :return: csr_matrix
+        """
+        return self.symbolic(shape).numeric(self.vals[:self.size])
+
+    def symbolic(self, shape: tuple = None) -> "SparsityPattern":
+        """
+        Assemblage symbolique : calcule une fois pour toutes la structure creuse de la matrice et la position de chaque
+        triplet dans le tableau data de la CSR
+        :param shape: taille de la matrice (voir le constructeur)
+        :return: SparsityPattern
+        """
+        return SparsityPattern(self.rows[:self.size], self.cols[:self.size], self._shape(shape))
+
+
+class SparsityPattern:
+    def __init__(self, rows: np.ndarray, cols: np.ndarray, shape: tuple):
+        """
+        Structure creuse d'une matrice CSR obtenue à partir de triplets avec doublons. Tant que le maillage ne change
+        pas, un réassemblage avec de nouveaux coefficients se résume à sommer les nouvelles valeurs dans le tableau
+        data grâce à la table scatter, sans retrier les indices.
+        :param rows: les lignes des triplets
+        :param cols: les colonnes des triplets
+        :param shape: taille de la matrice
+        """
+        self.shape : tuple = shape
+        keys = rows.astype(np.int64) * shape[1] + cols
+        unique, self.scatter = np.unique(keys, return_inverse=True) # scatter[t] : position du triplet t dans data
+        self.indices : np.ndarray = (unique % shape[1]).astype(np.int32)
+        self.indptr : np.ndarray = np.zeros(shape[0] + 1, dtype=np.int32 if len(unique) < 2**31 else np.int64)
+        np.cumsum(np.bincount(unique // shape[1], minlength=shape[0]), out=self.indptr[1:])
+        self.nnz : int = len(unique)
+
+    def numeric(self, vals: np.ndarray) -> csr_matrix:
+        """
+        Assemblage numérique : somme les valeurs des triplets (dans le même ordre que lors de l'assemblage
+        symbolique) aux bonnes positions
+        :param vals: les valeurs des triplets
+        :return: csr_matrix
         """
-        return self.data
\ No newline at end of file
+        data = np.bincount(self.scatter, weights=vals, minlength=self.nnz)
+        return csr_matrix((data, self.indices, self.indptr), shape=self.shape)